@@ -1,3 +1,4 @@
+import dataclasses
 import logging
 import os
 
@@ -5,6 +6,7 @@ import click
 import json
 
 from railostools.metadata.validation import validate
+from railostools.rly.diff import diff_railways
 from railostools.rly.parsing import RlyParser
 from railostools.ttb.parsing import TTBParser
 import railostools.exceptions as railos_exc
@@ -39,10 +41,49 @@ def ttb2json(ttb_file: str, output: str = "") -> None:
     ttb_parser.json(output)
 
 
+def _report_rly_diagnostics(parser: RlyParser) -> None:
+    _diagnostics = parser.diagnostics
+    _positions = parser.columns.positions
+
+    if _diagnostics.ok:
+        return
+
+    if _diagnostics.n_components > 1:
+        click.secho(
+            f"Railway is split into {_diagnostics.n_components} disconnected parts:",
+            fg="red",
+        )
+        for component in range(1, _diagnostics.n_components):
+            _members = (_diagnostics.components == component).nonzero()[0]
+            click.echo(
+                f"\t{len(_members)} element(s) starting at "
+                f"{tuple(_positions[_members[0]].tolist())}"
+            )
+    for element, port in _diagnostics.dangling.tolist():
+        click.secho(
+            f"Element at {tuple(_positions[element].tolist())} has no "
+            f"connection through port {port}",
+            fg="red",
+        )
+    for element in _diagnostics.unreachable_exits.tolist():
+        click.secho(
+            f"Exit at {tuple(_positions[element].tolist())} cannot reach "
+            "any named location",
+            fg="red",
+        )
+    raise click.Abort
+
+
 @railostools.command()
 @click.argument("input_file")
 @click.option("--dump/--silent", help="Write out JSON to stdout", default=False)
-def validate(input_file: str, dump: bool):
+@click.option(
+    "--rly",
+    help="Check the connectivity of a railway file",
+    is_flag=True,
+    default=False,
+)
+def validate(input_file: str, dump: bool, rly: bool = False):
     """Validate Railway Operation Simulator file"""
     if not os.path.exists(input_file):
         raise FileNotFoundError(
@@ -73,6 +114,8 @@ def validate(input_file: str, dump: bool):
                 f"Failed to parse file '{input_file}' with error: {e.args[0]}", fg="red"
             )
             raise click.Abort from e
+        if rly:
+            _report_rly_diagnostics(_parser)
         click.secho(
             f"Validation successful, file '{input_file}' passed all RLY file checks.",
             fg="green",
@@ -101,6 +144,38 @@ def rly2json(rly_file: str, output: str):
     _parser.dump(output)
 
 
+@railostools.command("rly-diff")
+@click.argument("old_file")
+@click.argument("new_file")
+@click.option("--json", "as_json", help="Write differences as JSON", is_flag=True)
+def rly_diff(old_file: str, new_file: str, as_json: bool = False) -> None:
+    """Compare two versions of a Railway Operation Simulator railway file"""
+    for rly_file in (old_file, new_file):
+        if not os.path.exists(rly_file):
+            raise FileNotFoundError(
+                f"Cannot compare rly files, file '{rly_file}' does not exist"
+            )
+
+    _diff = diff_railways(old_file, new_file)
+
+    if as_json:
+        click.echo(json.dumps(dataclasses.asdict(_diff), indent=2))
+        return
+
+    if not _diff:
+        click.secho("Railways are identical", fg="green")
+        return
+
+    for kind, changes in dataclasses.asdict(_diff).items():
+        if not changes:
+            continue
+        click.secho(
+            f"{kind.replace('_', ' ').capitalize()} ({len(changes)}):", bold=True
+        )
+        for change in changes:
+            click.echo(f"\t{', '.join(map(str, change))}")
+
+
 @railostools.command("metadata-expand")
 @click.argument("project_directory")
 def metadata_expander(project_directory: str) -> None:
@@ -43,6 +43,11 @@ class RailwayParsingError(Exception):
         super().__init__(msg)
 
 
+class RoutingError(Exception):
+    def __init__(self, msg: str) -> None:
+        super().__init__(msg)
+
+
 class InvalidOperationError(Exception):
     def __init__(self, msg: str) -> None:
         super().__init__(msg)
@@ -0,0 +1,91 @@
+import dataclasses
+import typing
+
+import numpy
+
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.port_graph import port_track_values
+from railostools.rly.routing import KMH_TO_MS
+
+# Weightings available for the adjacency matrix entries
+ADJACENCY_WEIGHTS: typing.Tuple[str, ...] = ("length", "time")
+
+
+@dataclasses.dataclass
+class AdjacencyMatrix:
+    """Sparse adjacency matrix of the active elements of a railway.
+
+    Held in compressed sparse row layout, the neighbours of element ``i``
+    being ``indices[indptr[i]:indptr[i + 1]]`` with matching ``weights``.
+    Row ``i`` is the element at ``coordinates[i]``.
+    """
+
+    indptr: numpy.ndarray
+    indices: numpy.ndarray
+    weights: numpy.ndarray
+    coordinates: numpy.ndarray
+
+    @property
+    def shape(self) -> typing.Tuple[int, int]:
+        return (len(self.coordinates), len(self.coordinates))
+
+
+def _half_weights(columns: RlyColumns, weight: str) -> numpy.ndarray:
+    """Weight of each element for the half traversed through each port.
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 10) array indexed by element and port, zero for unused ports
+    """
+    _halves = port_track_values(columns, columns.length) / 2
+    if weight == "length":
+        return _halves
+    # Unused ports have no length so any non-zero speed limit gives zero
+    return _halves / (port_track_values(columns, columns.speed_limit, 1) * KMH_TO_MS)
+
+
+def adjacency_matrix(columns: RlyColumns, weight: str = "length") -> AdjacencyMatrix:
+    """Build the weighted adjacency matrix of a railway from its neighbours.
+
+    Each entry joins the centres of two connected elements, weighted by the
+    half lengths, or minimum running times, of the tracks through the ports
+    joining them. Continuations are joined to their linked partners with a
+    weight of zero.
+
+    Parameters
+    ----------
+    columns: RlyColumns
+        columnar representation of the railway with neighbours assigned
+    weight: str, optional
+        either 'length' in metres or 'time' in seconds
+
+    Returns
+    -------
+    AdjacencyMatrix
+        the symmetric adjacency matrix
+    """
+    if weight not in ADJACENCY_WEIGHTS:
+        raise ValueError(f"Expected weight 'length' or 'time', got '{weight}'")
+
+    _n_elements: int = len(columns.element_id)
+    _sources, _targets, _ports = columns.neighbour_pairs()
+    _halves = _half_weights(columns, weight)
+    _weights = _halves[_sources, _ports] + _halves[_targets, 10 - _ports]
+
+    if columns.link is not None:
+        _linked = numpy.flatnonzero(columns.link >= 0)
+        _sources = numpy.concatenate((_sources, _linked))
+        _targets = numpy.concatenate((_targets, columns.link[_linked]))
+        _weights = numpy.concatenate((_weights, numpy.zeros(len(_linked))))
+
+    _order = numpy.lexsort((_targets, _sources))
+    _indptr = numpy.zeros(_n_elements + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(_sources, minlength=_n_elements), out=_indptr[1:])
+
+    return AdjacencyMatrix(
+        indptr=_indptr,
+        indices=_targets[_order].astype(numpy.int64),
+        weights=_weights[_order],
+        coordinates=columns.positions,
+    )
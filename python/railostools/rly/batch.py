@@ -0,0 +1,96 @@
+import concurrent.futures
+import dataclasses
+import time
+import typing
+
+from railostools.rly.cache import contents_digest
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.tokenizer import tokenize_contents
+
+
+@dataclasses.dataclass
+class ParseResult:
+    """Outcome of parsing one railway file within a batch.
+
+    Attributes
+    ----------
+    path: str
+        the railway file parsed
+    columns: RlyColumns | None
+        columnar representation of the railway with neighbours assigned,
+        None if parsing failed
+    seconds: float
+        time taken to parse the file
+    error: str | None
+        description of the failure if parsing failed
+    digest: str | None
+        digest of the content parsed, None if the file could not be read
+    """
+
+    path: str
+    columns: typing.Optional[RlyColumns]
+    seconds: float
+    error: typing.Optional[str] = None
+    digest: typing.Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def parse_columns(rly_file: str) -> ParseResult:
+    """Parse a single railway file to its columnar form, capturing any error"""
+    _start = time.perf_counter()
+    _digest: typing.Optional[str] = None
+    try:
+        with open(rly_file, "rb") as in_f:
+            _contents = in_f.read()
+        _digest = contents_digest(_contents)
+        _columns = RlyColumns.from_records(tokenize_contents(_contents))
+        _columns.assign_neighbours()
+    except Exception as e:
+        # One bad file must not end a batch, so every failure is recorded
+        return ParseResult(
+            path=rly_file,
+            columns=None,
+            seconds=time.perf_counter() - _start,
+            error=f"{type(e).__name__}: {e}",
+            digest=_digest,
+        )
+    return ParseResult(
+        path=rly_file,
+        columns=_columns,
+        seconds=time.perf_counter() - _start,
+        digest=_digest,
+    )
+
+
+def parse_many(
+    rly_files: typing.Iterable[str], workers: typing.Optional[int] = None
+) -> typing.List[ParseResult]:
+    """Parse many railway files in parallel.
+
+    Files are handed out one at a time to a pool of worker processes so that
+    large railways do not hold back the rest of the batch. Only the compact
+    columnar form of each railway is returned to the calling process.
+
+    Parameters
+    ----------
+    rly_files: Iterable[str]
+        railway files to parse
+    workers: int, optional
+        number of worker processes, by default one per CPU. If 1 the files
+        are parsed in the calling process
+
+    Returns
+    -------
+    List[ParseResult]
+        the result for each file in the order given
+    """
+    _files: typing.List[str] = list(rly_files)
+
+    if workers == 1 or len(_files) <= 1:
+        return [parse_columns(f) for f in _files]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_columns, _files))
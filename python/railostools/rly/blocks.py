@@ -0,0 +1,206 @@
+import dataclasses
+import heapq
+import math
+import typing
+
+import igraph
+import numpy
+
+from railostools.common.enumeration import Elements
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.port_graph import CENTRE_PORT, PortGraph
+from railostools.rly.relations import EXITS
+from railostools.rly.routing import running_times
+
+# Port through which a train passing each type of signal leaves the element
+SIGNAL_EXIT_PORTS: typing.Dict[Elements, int] = {
+    Elements.Signal_Right: 6,
+    Elements.Signal_Left: 4,
+    Elements.Signal_Up: 2,
+    Elements.Signal_Down: 8,
+    Elements.Signal_Up_Left: 1,
+    Elements.Signal_Up_Right: 3,
+    Elements.Signal_Down_Left: 7,
+    Elements.Signal_Down_Right: 9,
+}
+
+
+def _signal_entry_table() -> numpy.ndarray:
+    _table = numpy.full(max(Elements) + 1, -1, dtype=numpy.int8)
+    for element, exit_port in SIGNAL_EXIT_PORTS.items():
+        _table[element] = 10 - exit_port
+    return _table
+
+
+# Entry port of a train passing each element type's signal, -1 if none
+_SIGNAL_ENTRY_PORTS: numpy.ndarray = _signal_entry_table()
+
+
+def block_starts(graph: PortGraph, columns: RlyColumns) -> numpy.ndarray:
+    """Find the port graph vertices at which a block begins.
+
+    These are the vertices of signals for trains approaching them from
+    behind, and the centre vertices of exits for trains entering the railway.
+
+    Returns
+    -------
+    numpy.ndarray
+        vertex indices in ascending order
+    """
+    _element_types = columns.element_id[graph.element]
+    _entry_ports = _SIGNAL_ENTRY_PORTS[_element_types]
+    _signalled = (columns.signal[graph.element] != 0) & (graph.port == _entry_ports)
+    _entries = numpy.isin(_element_types, numpy.array([int(e) for e in EXITS])) & (
+        graph.port == CENTRE_PORT
+    )
+    return numpy.flatnonzero(_signalled | _entries)
+
+
+def _trace_block(
+    start: int,
+    is_start: typing.List[bool],
+    indptr: typing.List[int],
+    indices: typing.List[int],
+    lengths: typing.List[int],
+    times: typing.List[float],
+    speed_limits: typing.List[int],
+) -> typing.Tuple[typing.Dict[int, typing.Tuple[int, float]], typing.List[int], int]:
+    """Search a block from its first vertex up to the next block starts.
+
+    Returns
+    -------
+    Tuple[Dict[int, Tuple[int, float]], List[int], int]
+        shortest distance and its running time to each following block start
+        or dead end (keyed by -1), the vertices within the block and the
+        lowest speed limit within it
+    """
+    _best: typing.Dict[int, typing.Tuple[int, float]] = {start: (0, 0.0)}
+    _ends: typing.Dict[int, typing.Tuple[int, float]] = {}
+    _vertices: typing.List[int] = []
+    _speed: float = math.inf
+    _queue: typing.List[typing.Tuple[int, float, int]] = [(0, 0.0, start)]
+
+    while _queue:
+        _distance, _time, _vertex = heapq.heappop(_queue)
+        if (_distance, _time) > _best[_vertex]:
+            continue
+        if _vertex != start and is_start[_vertex]:
+            _ends[_vertex] = (_distance, _time)
+            continue
+        _vertices.append(_vertex)
+        if indptr[_vertex] == indptr[_vertex + 1]:
+            _ends[-1] = min(_ends.get(-1, (_distance, _time)), (_distance, _time))
+        for edge in range(indptr[_vertex], indptr[_vertex + 1]):
+            _speed = min(_speed, speed_limits[edge])
+            _next = indices[edge]
+            _reached = (_distance + lengths[edge], _time + times[edge])
+            if _reached < _best.get(_next, (numpy.inf, numpy.inf)):
+                _best[_next] = _reached
+                heapq.heappush(_queue, (*_reached, _next))
+
+    return _ends, _vertices, -1 if math.isinf(_speed) else int(_speed)
+
+
+@dataclasses.dataclass
+class BlockGraph:
+    """Directed graph of the signal blocks of a railway.
+
+    Each vertex is a block: the track a train may run over after passing a
+    signal, or after entering the railway at an exit, up to the next signal
+    in its direction of travel. Blocks beyond points are shared by every
+    route through them, so ``lengths`` is the shortest distance from the
+    start of the block to its end and ``speed_limits`` the lowest speed limit
+    within it. Each edge leads to a block which can be entered directly,
+    with the distance and minimum running time to it.
+    """
+
+    start_vertices: numpy.ndarray
+    origins: numpy.ndarray
+    signals: numpy.ndarray
+    lengths: numpy.ndarray
+    speed_limits: numpy.ndarray
+    elements: typing.List[numpy.ndarray]
+    edges: numpy.ndarray
+    edge_lengths: numpy.ndarray
+    edge_times: numpy.ndarray
+
+    @classmethod
+    def from_port_graph(cls, graph: PortGraph, columns: RlyColumns) -> "BlockGraph":
+        """Build the block graph of a railway from its port graph"""
+        _starts = block_starts(graph, columns)
+        _block_of = numpy.full(graph.n_vertices, -1, dtype=numpy.int64)
+        _block_of[_starts] = numpy.arange(len(_starts))
+
+        _arrays = (
+            graph.indptr.tolist(),
+            graph.indices.tolist(),
+            graph.lengths.tolist(),
+            running_times(graph).tolist(),
+            graph.speed_limits.tolist(),
+        )
+        _is_start: typing.List[bool] = (_block_of >= 0).tolist()
+
+        _lengths: typing.List[int] = []
+        _speed_limits: typing.List[int] = []
+        _elements: typing.List[numpy.ndarray] = []
+        _edges: typing.List[typing.Tuple[int, int]] = []
+        _edge_costs: typing.List[typing.Tuple[int, float]] = []
+
+        for block, start in enumerate(_starts.tolist()):
+            _ends, _vertices, _speed = _trace_block(start, _is_start, *_arrays)
+            _lengths.append(min((d for d, _ in _ends.values()), default=-1))
+            _speed_limits.append(_speed)
+            _elements.append(numpy.unique(graph.element[_vertices]))
+            for end, cost in sorted(_ends.items()):
+                if end >= 0:
+                    _edges.append((block, int(_block_of[end])))
+                    _edge_costs.append(cost)
+
+        _origins = graph.element[_starts]
+        return cls(
+            start_vertices=_starts,
+            origins=_origins,
+            signals=numpy.where(columns.signal[_origins] != 0, _origins, -1),
+            lengths=numpy.array(_lengths, dtype=numpy.int64),
+            speed_limits=numpy.array(_speed_limits, dtype=numpy.int64),
+            elements=_elements,
+            edges=numpy.array(_edges, dtype=numpy.int64).reshape(-1, 2),
+            edge_lengths=numpy.array([d for d, _ in _edge_costs], dtype=numpy.int64),
+            edge_times=numpy.array([t for _, t in _edge_costs], dtype=float),
+        )
+
+    @property
+    def n_blocks(self) -> int:
+        return len(self.start_vertices)
+
+    def to_igraph(self, columns: RlyColumns) -> igraph.Graph:
+        """Convert to a directed igraph graph.
+
+        Vertices carry the signal element index, -1 for blocks entered from
+        an exit, the position of the signal or exit, and the block length,
+        speed limit and element positions. Edges carry the distance and
+        minimum running time between block starts.
+        """
+        _graph = igraph.Graph(directed=True)
+        _graph.add_vertices(
+            self.n_blocks,
+            attributes={
+                "signal": self.signals.tolist(),
+                "x": columns.x[self.origins].tolist(),
+                "y": columns.y[self.origins].tolist(),
+                "length": self.lengths.tolist(),
+                "speed_limit": self.speed_limits.tolist(),
+                "positions": [
+                    list(zip(columns.x[e].tolist(), columns.y[e].tolist()))
+                    for e in self.elements
+                ],
+            },
+        )
+        _graph.add_edges(
+            self.edges.tolist(),
+            attributes={
+                "length": self.edge_lengths.tolist(),
+                "time": self.edge_times.tolist(),
+            },
+        )
+        return _graph
@@ -0,0 +1,209 @@
+import dataclasses
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import shutil
+import tempfile
+import typing
+
+import numpy
+
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.tokenizer import TextRecord
+
+# Name of the file within a cache entry holding all non-array data
+_METADATA_FILE: str = "metadata.json"
+
+# Name of the graph edge array within a cache entry
+_EDGES_ARRAY: str = "edges"
+
+# Incremented whenever the content of cache entries changes
+_CACHE_FORMAT: int = 3
+
+
+def _library_version() -> str:
+    try:
+        return importlib.metadata.version("railostools")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def railway_digest(rly_file: str) -> str:
+    """Return a key identifying the content of a railway file.
+
+    The key combines a hash of the file with the library version and cache
+    format so that results derived by older releases are never reused.
+    """
+    _hash = hashlib.sha256()
+    with open(rly_file, "rb") as in_f:
+        for chunk in iter(lambda: in_f.read(1 << 20), b""):
+            _hash.update(chunk)
+    return f"{_hash.hexdigest()}-{_library_version()}-{_CACHE_FORMAT}"
+
+
+def contents_digest(contents: bytes) -> str:
+    """Return the key given by ``railway_digest`` for content already read"""
+    _hash = hashlib.sha256(contents).hexdigest()
+    return f"{_hash}-{_library_version()}-{_CACHE_FORMAT}"
+
+
+def _column_arrays(columns: RlyColumns) -> typing.Dict[str, numpy.ndarray]:
+    return {
+        f.name: getattr(columns, f.name)
+        for f in dataclasses.fields(columns)
+        if isinstance(getattr(columns, f.name), numpy.ndarray)
+    }
+
+
+def _column_metadata(columns: RlyColumns) -> typing.Dict[str, typing.Any]:
+    """Gather all non-array data of the columns in a JSON serialisable form"""
+    return {
+        "arrays": list(_column_arrays(columns)),
+        "program_version": columns.program_version,
+        "home_position": columns.home_position,
+        "n_active_elements": columns.n_active_elements,
+        "n_inactive_elements": columns.n_inactive_elements,
+        "names": columns.names,
+        "text": columns.text,
+    }
+
+
+def _columns_from_arrays(
+    arrays: typing.Dict[str, numpy.ndarray], metadata: typing.Dict[str, typing.Any]
+) -> RlyColumns:
+    return RlyColumns(
+        **arrays,
+        program_version=metadata["program_version"],
+        home_position=tuple(metadata["home_position"]),
+        n_active_elements=metadata["n_active_elements"],
+        n_inactive_elements=metadata["n_inactive_elements"],
+        names=metadata["names"],
+        text=[TextRecord(tuple(i[0]), *i[1:]) for i in metadata["text"]],
+    )
+
+
+def save_railway(file_name: str, columns: RlyColumns, edges: numpy.ndarray) -> None:
+    """Write a parsed railway to a single NumPy ``.npz`` file.
+
+    The element arrays, neighbour adjacency and graph edges are stored
+    uncompressed so that they are read straight into memory on loading,
+    all other data being held as a JSON string.
+
+    Parameters
+    ----------
+    file_name: str
+        file to write
+    columns: RlyColumns
+        columnar representation of the railway
+    edges: numpy.ndarray
+        (M, 2) array of the railway graph edges
+    """
+    with open(file_name, "wb") as out_f:
+        numpy.savez(
+            out_f,
+            **_column_arrays(columns),
+            **{
+                _EDGES_ARRAY: edges,
+                _METADATA_FILE: numpy.array(json.dumps(_column_metadata(columns))),
+            },
+        )
+
+
+def load_railway(
+    file_name: typing.Union[str, typing.BinaryIO],
+) -> typing.Tuple[RlyColumns, numpy.ndarray]:
+    """Read a railway written by ``save_railway``, from a file or stream.
+
+    Returns
+    -------
+    Tuple[RlyColumns, numpy.ndarray]
+        columnar representation of the railway and its graph edges
+    """
+    with numpy.load(file_name) as in_f:
+        _metadata: typing.Dict[str, typing.Any] = json.loads(str(in_f[_METADATA_FILE]))
+        return (
+            _columns_from_arrays(
+                {name: in_f[name] for name in _metadata["arrays"]}, _metadata
+            ),
+            in_f[_EDGES_ARRAY],
+        )
+
+
+class RlyCache:
+    """On-disk cache of parsed railways.
+
+    Each entry is a directory named by the content hash of the railway file
+    and the library version. Element arrays, the neighbour adjacency and the
+    graph edges are stored as uncompressed NumPy ``.npy`` files which are
+    memory-mapped when loaded.
+    """
+
+    _logger = logging.getLogger("RailOSTools.RlyCache")
+
+    def __init__(self, cache_dir: str) -> None:
+        self._cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._cache_dir
+
+    def digest(self, rly_file: str) -> str:
+        """Return the cache key for the current content of a railway file"""
+        return railway_digest(rly_file)
+
+    def _entry(self, digest: str) -> str:
+        return os.path.join(self._cache_dir, digest)
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(os.path.join(self._entry(digest), _METADATA_FILE))
+
+    def load(
+        self, digest: str
+    ) -> typing.Optional[typing.Tuple[RlyColumns, numpy.ndarray]]:
+        """Load the columns and graph edges for a cache key if present"""
+        if digest not in self:
+            return None
+
+        _entry = self._entry(digest)
+
+        with open(os.path.join(_entry, _METADATA_FILE)) as in_f:
+            _metadata: typing.Dict[str, typing.Any] = json.load(in_f)
+
+        def _array(name: str) -> numpy.ndarray:
+            return numpy.load(os.path.join(_entry, f"{name}.npy"), mmap_mode="r")
+
+        _columns = _columns_from_arrays(
+            {name: _array(name) for name in _metadata["arrays"]}, _metadata
+        )
+        return _columns, _array(_EDGES_ARRAY)
+
+    def store(self, digest: str, columns: RlyColumns, edges: numpy.ndarray) -> None:
+        """Write the columns and graph edges for a cache key"""
+        if digest in self:
+            return
+
+        _arrays = _column_arrays(columns)
+
+        # Write into a temporary directory first so that partially written
+        # entries are never visible to other processes
+        _temp_dir = tempfile.mkdtemp(dir=self._cache_dir)
+
+        try:
+            for name, array in {**_arrays, _EDGES_ARRAY: edges}.items():
+                numpy.save(os.path.join(_temp_dir, f"{name}.npy"), array)
+
+            with open(os.path.join(_temp_dir, _METADATA_FILE), "w") as out_f:
+                json.dump(_column_metadata(columns), out_f)
+
+            os.replace(_temp_dir, self._entry(digest))
+        except OSError as e:
+            self._logger.warning(f"Failed to write cache entry '{digest}': {e}")
+            shutil.rmtree(_temp_dir, ignore_errors=True)
+
+    def clear(self) -> None:
+        """Remove all cached railways"""
+        for entry in os.listdir(self._cache_dir):
+            shutil.rmtree(os.path.join(self._cache_dir, entry), ignore_errors=True)
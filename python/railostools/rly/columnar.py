@@ -0,0 +1,399 @@
+import dataclasses
+import typing
+
+import numpy
+
+import railostools.exceptions as railos_exc
+from railostools.common.enumeration import Elements
+from railostools.rly.relations import MIRRORED_PORTS, PORT_OFFSETS, PORT_TABLE
+from railostools.rly.tokenizer import (
+    ActiveRecord,
+    InactiveRecord,
+    InactiveSectionRecord,
+    MetadataRecord,
+    RlyRecord,
+    TextRecord,
+)
+
+# Signal types indexed by their integer code, zero meaning no signal
+SIGNAL_CODES: typing.Tuple[typing.Optional[str], ...] = (
+    None,
+    "ground",
+    "2AT",
+    "3AT",
+    "4AT",
+)
+
+_VALID_ELEMENT_IDS: numpy.ndarray = numpy.zeros(PORT_TABLE.shape[0], dtype=bool)
+_VALID_ELEMENT_IDS[[int(e) for e in Elements]] = True
+
+
+def _optional(value: int) -> typing.Optional[int]:
+    return value if value != -1 else None
+
+
+def find_neighbours(
+    element_id: numpy.ndarray,
+    x: numpy.ndarray,
+    y: numpy.ndarray,
+    rows: typing.Optional[numpy.ndarray] = None,
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """Find the connected neighbours of every element at once.
+
+    Each element's connection ports are followed to the adjacent cell, a
+    neighbour being connected if it has the mirrored port. Positions are
+    resolved by binary search over sorted cell keys, where elements share a
+    position the first is used. If ``rows`` is given only the neighbours of
+    those elements are found, all others having none.
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray]
+        index pointer and index arrays in compressed sparse row layout, the
+        neighbours of element ``i`` being ``indices[indptr[i]:indptr[i + 1]]``
+        in connection port order
+    """
+    _n_elements: int = len(element_id)
+
+    if not _n_elements:
+        return numpy.zeros(1, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+
+    # Offset the grid so that every neighbouring cell has a unique key
+    _x_origin: int = int(x.min()) - 1
+    _y_origin: int = int(y.min()) - 1
+    _height: int = int(y.max()) - _y_origin + 2
+    _keys = (x - _x_origin).astype(numpy.int64) * _height + (y - _y_origin)
+
+    _order = numpy.argsort(_keys, kind="stable")
+    _sorted_keys = _keys[_order]
+    _first = numpy.ones(_n_elements, dtype=bool)
+    _first[1:] = _sorted_keys[1:] != _sorted_keys[:-1]
+    _unique_keys = _sorted_keys[_first]
+    _unique_index = _order[_first]
+
+    _sources: typing.List[numpy.ndarray] = []
+    _targets: typing.List[numpy.ndarray] = []
+    _ports: typing.List[numpy.ndarray] = []
+
+    for port, (dx, dy) in PORT_OFFSETS.items():
+        _candidates = numpy.flatnonzero(PORT_TABLE[element_id, port])
+        if rows is not None:
+            _candidates = _candidates[numpy.isin(_candidates, rows)]
+        _target_keys = _keys[_candidates] + dx * _height + dy
+        _located = numpy.minimum(
+            numpy.searchsorted(_unique_keys, _target_keys), len(_unique_keys) - 1
+        )
+        _found = _unique_keys[_located] == _target_keys
+        _found_targets = _unique_index[_located[_found]]
+        _connected = PORT_TABLE[element_id[_found_targets], MIRRORED_PORTS[port]]
+        _sources.append(_candidates[_found][_connected])
+        _targets.append(_found_targets[_connected])
+        _ports.append(numpy.full(_connected.sum(), port))
+
+    _all_sources = numpy.concatenate(_sources)
+    _order = numpy.lexsort((numpy.concatenate(_ports), _all_sources))
+    _indptr = numpy.zeros(_n_elements + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(_all_sources, minlength=_n_elements), out=_indptr[1:])
+
+    return _indptr, numpy.concatenate(_targets)[_order].astype(numpy.int64)
+
+
+@dataclasses.dataclass
+class RlyColumns:
+    """Columnar representation of a railway.
+
+    Every attribute of the active and inactive elements is held as a NumPy
+    array with one entry per element. Names are stored as integer codes into
+    the interned ``names`` table and absent values are encoded as ``-1``.
+    Continuation elements hold the index of their linked partner in ``link``.
+    """
+
+    program_version: str
+    home_position: typing.Tuple[int, int]
+    n_active_elements: int
+    n_inactive_elements: typing.Optional[int]
+    element_id: numpy.ndarray
+    x: numpy.ndarray
+    y: numpy.ndarray
+    length: numpy.ndarray
+    speed_limit: numpy.ndarray
+    signal: numpy.ndarray
+    location_name: numpy.ndarray
+    active_element_name: numpy.ndarray
+    inactive_element_id: numpy.ndarray
+    inactive_x: numpy.ndarray
+    inactive_y: numpy.ndarray
+    inactive_location_name: numpy.ndarray
+    names: typing.List[str]
+    text: typing.List[TextRecord]
+    neighbour_indptr: typing.Optional[numpy.ndarray] = None
+    neighbour_indices: typing.Optional[numpy.ndarray] = None
+    link: typing.Optional[numpy.ndarray] = None
+
+    @classmethod
+    def from_records(cls, records: typing.Iterable[RlyRecord]) -> "RlyColumns":
+        """Build the columns from a stream of railway file records"""
+        _metadata: typing.Optional[MetadataRecord] = None
+        _n_inactive: typing.Optional[int] = None
+        _names: typing.Dict[str, int] = {}
+        _active: typing.Dict[str, typing.List] = {
+            k: []
+            for k in (
+                "element_id",
+                "x",
+                "y",
+                "length",
+                "speed_limit",
+                "signal",
+                "location_name",
+                "active_element_name",
+            )
+        }
+        _inactive: typing.Dict[str, typing.List] = {
+            k: [] for k in ("element_id", "x", "y", "location_name")
+        }
+        _text: typing.List[TextRecord] = []
+        _file_indices: typing.Dict[int, int] = {}
+        _links: typing.Dict[int, int] = {}
+
+        def _code(name: typing.Optional[str]) -> int:
+            return -1 if name is None else _names.setdefault(name, len(_names))
+
+        for record in records:
+            if isinstance(record, ActiveRecord):
+                if record.link is not None:
+                    _links[len(_active["element_id"])] = record.link
+                _file_indices[record.file_index] = len(_active["element_id"])
+                _active["element_id"].append(record.element_id)
+                _active["x"].append(record.position[0])
+                _active["y"].append(record.position[1])
+                _active["length"].append(
+                    [-1 if i is None else i for i in record.length]
+                )
+                _active["speed_limit"].append(
+                    [-1 if i is None else i for i in record.speed_limit]
+                )
+                _active["signal"].append(SIGNAL_CODES.index(record.signal))
+                _active["location_name"].append(_code(record.location_name))
+                _active["active_element_name"].append(_code(record.active_element_name))
+            elif isinstance(record, InactiveRecord):
+                _inactive["element_id"].append(record.element_id)
+                _inactive["x"].append(record.position[0])
+                _inactive["y"].append(record.position[1])
+                _inactive["location_name"].append(_code(record.location_name))
+            elif isinstance(record, TextRecord):
+                _text.append(record)
+            elif isinstance(record, InactiveSectionRecord):
+                _n_inactive = record.n_inactive_elements
+            else:
+                _metadata = record
+
+        if not _metadata:
+            raise railos_exc.ParsingError("Failed to retrieve railway metadata.")
+
+        # Continuations refer to their partner by its index within the file
+        _link = numpy.full(len(_active["element_id"]), -1, dtype=numpy.int32)
+        for index, link in _links.items():
+            _link[index] = _file_indices.get(link, -1)
+
+        _columns = cls(
+            program_version=_metadata.program_version,
+            home_position=_metadata.home_position,
+            n_active_elements=_metadata.n_active_elements,
+            n_inactive_elements=_n_inactive,
+            element_id=numpy.array(_active["element_id"], dtype=numpy.int16),
+            x=numpy.array(_active["x"], dtype=numpy.int32),
+            y=numpy.array(_active["y"], dtype=numpy.int32),
+            length=numpy.array(_active["length"], dtype=numpy.int32).reshape(-1, 2),
+            speed_limit=numpy.array(_active["speed_limit"], dtype=numpy.int32).reshape(
+                -1, 2
+            ),
+            signal=numpy.array(_active["signal"], dtype=numpy.int8),
+            location_name=numpy.array(_active["location_name"], dtype=numpy.int32),
+            active_element_name=numpy.array(
+                _active["active_element_name"], dtype=numpy.int32
+            ),
+            inactive_element_id=numpy.array(_inactive["element_id"], dtype=numpy.int16),
+            inactive_x=numpy.array(_inactive["x"], dtype=numpy.int32),
+            inactive_y=numpy.array(_inactive["y"], dtype=numpy.int32),
+            inactive_location_name=numpy.array(
+                _inactive["location_name"], dtype=numpy.int32
+            ),
+            names=list(_names),
+            text=_text,
+            link=_link,
+        )
+
+        _columns.validate()
+        return _columns
+
+    def validate(self) -> None:
+        """Check element types are known and lengths and speeds are valid"""
+        for element_ids in (self.element_id, self.inactive_element_id):
+            _in_range = (element_ids >= 0) & (element_ids < len(_VALID_ELEMENT_IDS))
+            _valid = (
+                _in_range & _VALID_ELEMENT_IDS[numpy.where(_in_range, element_ids, 0)]
+            )
+            if not _valid.all():
+                raise railos_exc.RailwayParsingError(
+                    f"Invalid element type '{element_ids[~_valid][0]}'"
+                )
+        for name, values in (
+            ("length", self.length),
+            ("speed limit", self.speed_limit),
+        ):
+            if (values[:, 0] < 0).any() or (values[:, 1] < -1).any():
+                raise railos_exc.RailwayParsingError(f"Invalid element {name} found")
+
+    def assign_neighbours(self) -> None:
+        """Compute the connected neighbours of all active elements"""
+        self.neighbour_indptr, self.neighbour_indices = find_neighbours(
+            self.element_id, self.x, self.y
+        )
+
+    def neighbours(self, index: int) -> numpy.ndarray:
+        """Return the indices of the elements connected to the given element"""
+        return self.neighbour_indices[
+            self.neighbour_indptr[index] : self.neighbour_indptr[index + 1]
+        ]
+
+    def neighbour_pairs(
+        self,
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """List every connected element pair along with the port joining them.
+
+        Returns
+        -------
+        Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            index of each element, its neighbour, and the port of the
+            element facing that neighbour, in neighbour list order
+        """
+        _sources = numpy.repeat(
+            numpy.arange(len(self.element_id)), numpy.diff(self.neighbour_indptr)
+        )
+        _targets = self.neighbour_indices
+
+        # Ports are numbered as a 3x3 grid about the element centre port 5
+        _ports = (
+            5
+            + (self.x[_targets] - self.x[_sources])
+            + 3 * (self.y[_targets] - self.y[_sources])
+        )
+        return _sources, _targets, _ports
+
+    def neighbour_ports(self) -> numpy.ndarray:
+        """Tabulate the connected neighbour of each element through each port.
+
+        Returns
+        -------
+        numpy.ndarray
+            (N, 10) array indexed by element and port holding the index of
+            the connected neighbour, or -1 where there is none
+        """
+        _sources, _targets, _ports = self.neighbour_pairs()
+        _table = numpy.full((len(self.element_id), 10), -1, dtype=numpy.int64)
+        _table[_sources, _ports] = _targets
+        return _table
+
+    def edges(self) -> numpy.ndarray:
+        """Return each connected element pair once as an (M, 2) index array.
+
+        Pairs are ordered with the lower element index first and the rows
+        sorted lexicographically.
+        """
+        _sources = numpy.repeat(
+            numpy.arange(len(self.element_id)), numpy.diff(self.neighbour_indptr)
+        )
+        return numpy.unique(
+            numpy.sort(numpy.column_stack((_sources, self.neighbour_indices)), axis=1),
+            axis=0,
+        ).reshape(-1, 2)
+
+    @property
+    def positions(self) -> numpy.ndarray:
+        """Active element coordinates as an (N, 2) array"""
+        return numpy.column_stack((self.x, self.y))
+
+    @property
+    def inactive_positions(self) -> numpy.ndarray:
+        """Inactive element coordinates as an (N, 2) array"""
+        return numpy.column_stack((self.inactive_x, self.inactive_y))
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the element arrays"""
+        return sum(
+            getattr(self, f.name).nbytes
+            for f in dataclasses.fields(self)
+            if isinstance(getattr(self, f.name), numpy.ndarray)
+        ) + sum(len(n) for n in self.names)
+
+    def name(self, code: int) -> typing.Optional[str]:
+        """Return the location name for an interned name code"""
+        return self.names[code] if code >= 0 else None
+
+    def group_by_name(self) -> typing.Dict[str, numpy.ndarray]:
+        """Group the active element indices by their active element name.
+
+        Groups are found in a single pass by sorting on the interned name
+        codes, each group holding its element indices in file order.
+        """
+        _order = numpy.argsort(self.active_element_name, kind="stable")
+        _codes = self.active_element_name[_order]
+        _bounds = numpy.flatnonzero(numpy.diff(_codes)) + 1
+        return {
+            self.names[group_codes[0]]: indices
+            for group_codes, indices in zip(
+                numpy.split(_codes, _bounds), numpy.split(_order, _bounds)
+            )
+            if len(indices) and group_codes[0] >= 0
+        }
+
+    def count(self, element_types: typing.Iterable[Elements]) -> int:
+        """Count the active elements which are one of the given types"""
+        return int(numpy.isin(self.element_id, numpy.array(list(element_types))).sum())
+
+    def active_records(self) -> typing.Iterator[ActiveRecord]:
+        """Iterate through the active elements as records"""
+        for (
+            element_id,
+            x,
+            y,
+            length,
+            speed_limit,
+            location_name,
+            active_element_name,
+            signal,
+        ) in zip(
+            self.element_id.tolist(),
+            self.x.tolist(),
+            self.y.tolist(),
+            self.length.tolist(),
+            self.speed_limit.tolist(),
+            self.location_name.tolist(),
+            self.active_element_name.tolist(),
+            self.signal.tolist(),
+        ):
+            yield ActiveRecord(
+                element_id=element_id,
+                position=(x, y),
+                length=(length[0], _optional(length[1])),
+                speed_limit=(speed_limit[0], _optional(speed_limit[1])),
+                location_name=self.name(location_name),
+                active_element_name=self.name(active_element_name),
+                signal=SIGNAL_CODES[signal],
+            )
+
+    def inactive_records(self) -> typing.Iterator[InactiveRecord]:
+        """Iterate through the inactive elements as records"""
+        for element_id, x, y, location_name in zip(
+            self.inactive_element_id.tolist(),
+            self.inactive_x.tolist(),
+            self.inactive_y.tolist(),
+            self.inactive_location_name.tolist(),
+        ):
+            yield InactiveRecord(
+                element_id=element_id,
+                position=(x, y),
+                location_name=self.name(location_name),
+            )
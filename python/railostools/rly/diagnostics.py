@@ -0,0 +1,155 @@
+import dataclasses
+import typing
+
+import igraph
+import numpy
+
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.port_graph import CENTRE_PORT, PortGraph
+from railostools.rly.relations import EXITS, PORT_TABLE
+
+
+@dataclasses.dataclass
+class RlyDiagnostics:
+    """Connectivity problems found within a railway.
+
+    Attributes
+    ----------
+    components: numpy.ndarray
+        connected component of each active element, numbered from the
+        largest component down
+    dangling: numpy.ndarray
+        (M, 2) array of element index and port for each connection port
+        with no matching neighbour
+    unreachable_exits: numpy.ndarray
+        indices of exits from which no named location can be reached
+    """
+
+    components: numpy.ndarray
+    dangling: numpy.ndarray
+    unreachable_exits: numpy.ndarray
+
+    @property
+    def n_components(self) -> int:
+        return int(self.components.max()) + 1 if len(self.components) else 0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the railway is a single connected network without problems"""
+        return (
+            self.n_components <= 1
+            and not len(self.dangling)
+            and not len(self.unreachable_exits)
+        )
+
+
+def element_components(columns: RlyColumns) -> numpy.ndarray:
+    """Label the connected components of the railway.
+
+    Elements are connected to their neighbours and continuations to their
+    linked partners, components being numbered by decreasing size.
+    """
+    _n_elements: int = len(columns.element_id)
+    _edges = [columns.edges()]
+    if columns.link is not None:
+        _linked = numpy.flatnonzero(columns.link >= 0)
+        _edges.append(numpy.column_stack((_linked, columns.link[_linked])))
+
+    _graph = igraph.Graph(n=_n_elements, edges=numpy.concatenate(_edges).tolist())
+    _membership = numpy.array(_graph.connected_components().membership)
+
+    # Renumber so that the main network is always component zero
+    _sizes = numpy.bincount(_membership, minlength=1)
+    _rank = numpy.empty_like(_sizes)
+    _rank[numpy.argsort(-_sizes, kind="stable")] = numpy.arange(len(_sizes))
+    return _rank[_membership] if _n_elements else _membership
+
+
+def dangling_ports(columns: RlyColumns) -> numpy.ndarray:
+    """Find connection ports of elements which have no neighbour.
+
+    Returns
+    -------
+    numpy.ndarray
+        (M, 2) array of element index and port, ordered by element
+    """
+    _unmatched = PORT_TABLE[columns.element_id] & (columns.neighbour_ports() < 0)
+    return numpy.argwhere(_unmatched)
+
+
+def unreachable_exits(
+    graph: PortGraph, columns: RlyColumns, named: numpy.ndarray
+) -> numpy.ndarray:
+    """Find exits from which a train cannot reach any named location.
+
+    A single search is made backwards from all named location vertices at
+    once, via an extra vertex joined to each of them. Exits which are named
+    locations themselves must still lead somewhere named.
+
+    Parameters
+    ----------
+    graph: PortGraph
+        the port graph of the railway
+    columns: RlyColumns
+        columnar representation of the railway
+    named: numpy.ndarray
+        indices of the elements forming named locations
+
+    Returns
+    -------
+    numpy.ndarray
+        element indices of the unreachable exits
+    """
+    _exits = numpy.flatnonzero(
+        numpy.isin(columns.element_id, numpy.array([int(e) for e in EXITS]))
+    )
+    _entry_vertices = graph.vertices(_exits)
+    _entry_vertices = _entry_vertices[graph.port[_entry_vertices] == CENTRE_PORT]
+
+    _sources = numpy.repeat(numpy.arange(graph.n_vertices), numpy.diff(graph.indptr))
+    _root = graph.n_vertices
+    _named = numpy.setdiff1d(graph.vertices(named), _entry_vertices)
+    _edges = numpy.concatenate(
+        (
+            numpy.column_stack((_sources, graph.indices)),
+            numpy.column_stack((_named, numpy.full(len(_named), _root))),
+        )
+    )
+    _graph = igraph.Graph(n=_root + 1, edges=_edges.tolist(), directed=True)
+    _reaching = numpy.zeros(_root + 1, dtype=bool)
+    _reaching[_graph.subcomponent(_root, mode="in")] = True
+
+    return graph.element[_entry_vertices[~_reaching[_entry_vertices]]]
+
+
+def diagnose(
+    graph: PortGraph,
+    columns: RlyColumns,
+    locations: typing.Dict[str, numpy.ndarray],
+) -> RlyDiagnostics:
+    """Check the connectivity of a railway.
+
+    Parameters
+    ----------
+    graph: PortGraph
+        the port graph of the railway
+    columns: RlyColumns
+        columnar representation of the railway
+    locations: Dict[str, numpy.ndarray]
+        indices of the elements forming each named location
+
+    Returns
+    -------
+    RlyDiagnostics
+        components, dangling ports and unreachable exits
+    """
+    _named = (
+        numpy.concatenate(list(locations.values()))
+        if locations
+        else numpy.zeros(0, dtype=numpy.int64)
+    )
+    return RlyDiagnostics(
+        components=element_components(columns),
+        dangling=dangling_ports(columns),
+        unreachable_exits=unreachable_exits(graph, columns, _named),
+    )
@@ -0,0 +1,235 @@
+import dataclasses
+import typing
+
+import numpy
+
+from railostools.common.enumeration import Elements
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.tokenizer import tokenize
+
+Position = typing.Tuple[int, int]
+
+# Position of an element with its old and new values of an attribute
+_AttributeChange = typing.Tuple[
+    Position, typing.Tuple[int, ...], typing.Tuple[int, ...]
+]
+
+# Kinds of element compared, with the prefix of their columns
+_ELEMENT_KINDS: typing.Dict[str, str] = {"active": "", "inactive": "inactive_"}
+
+
+@dataclasses.dataclass
+class RlyDiff:
+    """Structural differences between two versions of a railway.
+
+    Elements are compared by kind and position, where several elements of
+    one kind share a position only the first being compared. Each change is
+    recorded against the element position.
+
+    Attributes
+    ----------
+    added: List[Tuple[str, Position, str]]
+        kind, position and type of elements only in the new railway
+    removed: List[Tuple[str, Position, str]]
+        kind, position and type of elements only in the old railway
+    retyped: List[Tuple[str, Position, str, str]]
+        kind, position and old and new type of replaced elements
+    renamed_locations: List[Tuple[str, str]]
+        old and new names of locations whose elements were renamed
+    changed_lengths: List[Tuple[Position, Tuple, Tuple]]
+        position and old and new track lengths of active elements
+    changed_speed_limits: List[Tuple[Position, Tuple, Tuple]]
+        position and old and new speed limits of active elements
+    connected: List[Tuple[Position, Position]]
+        pairs of active elements newly joined together
+    disconnected: List[Tuple[Position, Position]]
+        pairs of active elements no longer joined together
+    """
+
+    added: typing.List[typing.Tuple[str, Position, str]] = dataclasses.field(
+        default_factory=list
+    )
+    removed: typing.List[typing.Tuple[str, Position, str]] = dataclasses.field(
+        default_factory=list
+    )
+    retyped: typing.List[typing.Tuple[str, Position, str, str]] = dataclasses.field(
+        default_factory=list
+    )
+    renamed_locations: typing.List[typing.Tuple[str, str]] = dataclasses.field(
+        default_factory=list
+    )
+    changed_lengths: typing.List[_AttributeChange] = dataclasses.field(
+        default_factory=list
+    )
+    changed_speed_limits: typing.List[_AttributeChange] = dataclasses.field(
+        default_factory=list
+    )
+    connected: typing.List[typing.Tuple[Position, Position]] = dataclasses.field(
+        default_factory=list
+    )
+    disconnected: typing.List[typing.Tuple[Position, Position]] = dataclasses.field(
+        default_factory=list
+    )
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, f.name) for f in dataclasses.fields(self))
+
+    def counts(self) -> typing.Dict[str, int]:
+        """Number of changes of each kind"""
+        return {f.name: len(getattr(self, f.name)) for f in dataclasses.fields(self)}
+
+
+def _elements_by_position(
+    columns: RlyColumns, prefix: str
+) -> typing.Dict[Position, int]:
+    """Map each position to the index of the first element found there"""
+    _positions = list(
+        zip(
+            getattr(columns, f"{prefix}x").tolist(),
+            getattr(columns, f"{prefix}y").tolist(),
+        )
+    )
+    return dict(zip(reversed(_positions), range(len(_positions) - 1, -1, -1)))
+
+
+def _connections(columns: RlyColumns) -> typing.Set[typing.Tuple[Position, Position]]:
+    _positions = list(zip(columns.x.tolist(), columns.y.tolist()))
+    return {
+        tuple(sorted((_positions[i], _positions[j])))
+        for i, j in columns.edges().tolist()
+    }
+
+
+def _names(columns: RlyColumns, codes: typing.List[int]) -> typing.List[str]:
+    return [columns.names[c] if c >= 0 else None for c in codes]
+
+
+def _compare_elements(
+    old: RlyColumns, new: RlyColumns, kind: str, diff: RlyDiff
+) -> typing.List[typing.Tuple[Position, int, int]]:
+    """Record added, removed and retyped elements of one kind.
+
+    Returns
+    -------
+    List[Tuple[Position, int, int]]
+        position and old and new index of elements of unchanged type
+    """
+    _prefix = _ELEMENT_KINDS[kind]
+    _old = _elements_by_position(old, _prefix)
+    _new = _elements_by_position(new, _prefix)
+    _old_types = getattr(old, f"{_prefix}element_id").tolist()
+    _new_types = getattr(new, f"{_prefix}element_id").tolist()
+    _kept: typing.List[typing.Tuple[Position, int, int]] = []
+
+    for position, i in _old.items():
+        if (j := _new.get(position)) is None:
+            diff.removed.append((kind, position, Elements(_old_types[i]).name))
+        elif _old_types[i] != _new_types[j]:
+            diff.retyped.append(
+                (
+                    kind,
+                    position,
+                    Elements(_old_types[i]).name,
+                    Elements(_new_types[j]).name,
+                )
+            )
+        else:
+            _kept.append((position, i, j))
+
+    diff.added.extend(
+        (kind, position, Elements(_new_types[j]).name)
+        for position, j in _new.items()
+        if position not in _old
+    )
+    return _kept
+
+
+def _compare_names(
+    old: RlyColumns,
+    new: RlyColumns,
+    kept: typing.Dict[str, typing.List[typing.Tuple[Position, int, int]]],
+) -> typing.List[typing.Tuple[str, str]]:
+    """Find pairs of location names given to the same elements"""
+    _renamed: typing.Set[typing.Tuple[str, str]] = set()
+    for kind, columns_names in (
+        ("active", ("location_name", "active_element_name")),
+        ("inactive", ("inactive_location_name",)),
+    ):
+        _old_rows = [i for _, i, _ in kept[kind]]
+        _new_rows = [j for _, _, j in kept[kind]]
+        for name in columns_names:
+            _old_names = _names(old, getattr(old, name)[_old_rows].tolist())
+            _new_names = _names(new, getattr(new, name)[_new_rows].tolist())
+            _renamed.update(
+                (a, b) for a, b in zip(_old_names, _new_names) if a and b and a != b
+            )
+    return sorted(_renamed)
+
+
+def diff_columns(old: RlyColumns, new: RlyColumns) -> RlyDiff:
+    """Compare two versions of a railway.
+
+    All comparisons are made through hashed position keys so that the time
+    taken grows linearly with the size of the railways.
+
+    Parameters
+    ----------
+    old: RlyColumns
+        previous version of the railway, with neighbours assigned
+    new: RlyColumns
+        new version of the railway, with neighbours assigned
+
+    Returns
+    -------
+    RlyDiff
+        all differences found
+    """
+    _diff = RlyDiff()
+    _kept = {kind: _compare_elements(old, new, kind, _diff) for kind in _ELEMENT_KINDS}
+    _diff.renamed_locations = _compare_names(old, new, _kept)
+
+    _positions = [position for position, _, _ in _kept["active"]]
+    _old_rows = [i for _, i, _ in _kept["active"]]
+    _new_rows = [j for _, _, j in _kept["active"]]
+    for attribute, changes in (
+        ("length", _diff.changed_lengths),
+        ("speed_limit", _diff.changed_speed_limits),
+    ):
+        _before = getattr(old, attribute)[_old_rows]
+        _after = getattr(new, attribute)[_new_rows]
+        changes.extend(
+            (_positions[k], tuple(_before[k].tolist()), tuple(_after[k].tolist()))
+            for k in numpy.flatnonzero((_before != _after).any(axis=1)).tolist()
+        )
+
+    _old_connections = _connections(old)
+    _new_connections = _connections(new)
+    _diff.connected = sorted(_new_connections - _old_connections)
+    _diff.disconnected = sorted(_old_connections - _new_connections)
+
+    return _diff
+
+
+def diff_railways(old_file: str, new_file: str) -> RlyDiff:
+    """Compare two railway files.
+
+    Only the columnar form of each railway is built, no element models
+    being created.
+
+    Parameters
+    ----------
+    old_file: str
+        previous version of the railway file
+    new_file: str
+        new version of the railway file
+
+    Returns
+    -------
+    RlyDiff
+        all differences found
+    """
+    _columns: typing.List[RlyColumns] = []
+    for rly_file in (old_file, new_file):
+        _columns.append(RlyColumns.from_records(tokenize(rly_file)))
+        _columns[-1].assign_neighbours()
+    return diff_columns(*_columns)
@@ -0,0 +1,208 @@
+import dataclasses
+import typing
+
+import numpy
+
+from railostools.rly.columnar import RlyColumns, find_neighbours
+
+
+@dataclasses.dataclass
+class RlyChanges:
+    """Correspondence between the active elements of two railway versions.
+
+    Attributes
+    ----------
+    old_of_new: numpy.ndarray
+        index in the old railway of each new element with the same position
+        and type, -1 for added elements
+    removed: numpy.ndarray
+        indices of old elements with no counterpart in the new railway
+    added: numpy.ndarray
+        indices of new elements with no counterpart in the old railway
+    affected: numpy.ndarray
+        indices of new elements lying in or beside a cell whose elements
+        changed, these being the only elements whose neighbours may differ
+    """
+
+    old_of_new: numpy.ndarray
+    removed: numpy.ndarray
+    added: numpy.ndarray
+    affected: numpy.ndarray
+
+    @property
+    def keeps_indices(self) -> bool:
+        """Whether every paired element has the same index in both versions"""
+        _kept = numpy.flatnonzero(self.old_of_new >= 0)
+        return bool((self.old_of_new[_kept] == _kept).all())
+
+    @property
+    def preserves_order(self) -> bool:
+        """Whether new elements keep the old order, with additions at the end"""
+        _kept = self.old_of_new[self.old_of_new >= 0]
+        return bool((numpy.diff(_kept) > 0).all() and (self.added >= len(_kept)).all())
+
+
+def _element_keys(
+    columns: RlyColumns, origin: typing.Tuple[int, int], height: int
+) -> numpy.ndarray:
+    """Encode the cell and type of each element as ``cell * 256 + type``"""
+    _cells = (columns.x - origin[0]).astype(numpy.int64) * height + (
+        columns.y - origin[1]
+    )
+    return _cells * 256 + columns.element_id
+
+
+def _occurrences(keys: numpy.ndarray) -> numpy.ndarray:
+    """Number each element by its occurrence amongst those sharing its key"""
+    _order = numpy.argsort(keys, kind="stable")
+    _sorted = keys[_order]
+    _starts = numpy.flatnonzero(numpy.r_[True, _sorted[1:] != _sorted[:-1]])
+    _counts = numpy.diff(numpy.r_[_starts, len(keys)])
+    _occurrence = numpy.empty(len(keys), dtype=numpy.int64)
+    _occurrence[_order] = numpy.arange(len(keys)) - numpy.repeat(_starts, _counts)
+    return _occurrence
+
+
+def match_elements(old: RlyColumns, new: RlyColumns) -> RlyChanges:
+    """Pair the active elements of two versions of a railway.
+
+    Elements are paired by position and type, those sharing both being
+    paired in file order. The neighbourhood of every cell whose elements
+    differ is marked as affected.
+
+    Returns
+    -------
+    RlyChanges
+        the pairing of old and new elements
+    """
+    _x = numpy.concatenate((old.x, new.x))
+    _y = numpy.concatenate((old.y, new.y))
+    _origin = (int(_x.min()) - 1, int(_y.min()) - 1) if len(_x) else (0, 0)
+    _height: int = int(_y.max()) - _origin[1] + 2 if len(_y) else 1
+
+    _old_keys = _element_keys(old, _origin, _height)
+    _new_keys = _element_keys(new, _origin, _height)
+    _old_occurrences = _occurrences(_old_keys)
+    _new_occurrences = _occurrences(_new_keys)
+
+    # Combine each key with its occurrence so that elements stacked at the
+    # same position and of the same type are paired in file order
+    _stride: int = (
+        int(max(_old_occurrences.max(initial=0), _new_occurrences.max(initial=0))) + 1
+    )
+    _old_ids = _old_keys * _stride + _old_occurrences
+    _new_ids = _new_keys * _stride + _new_occurrences
+    _order = numpy.argsort(_old_ids)
+    _located = numpy.minimum(
+        numpy.searchsorted(_old_ids[_order], _new_ids), max(len(_order) - 1, 0)
+    )
+    _old_of_new = numpy.full(len(_new_ids), -1, dtype=numpy.int64)
+    if len(_order):
+        _matched = _old_ids[_order][_located] == _new_ids
+        _old_of_new[_matched] = _order[_located[_matched]]
+
+    _kept = numpy.zeros(len(_old_ids), dtype=bool)
+    _kept[_old_of_new[_old_of_new >= 0]] = True
+    _removed = numpy.flatnonzero(~_kept)
+    _added = numpy.flatnonzero(_old_of_new < 0)
+
+    _changed_cells = numpy.unique(
+        numpy.concatenate((_old_keys[_removed], _new_keys[_added])) // 256
+    )
+    # Cells within one step of a change, including diagonally
+    _steps = (numpy.arange(-1, 2)[:, None] * _height + numpy.arange(-1, 2)).ravel()
+    _near = (_changed_cells[:, None] + _steps).ravel()
+
+    return RlyChanges(
+        old_of_new=_old_of_new,
+        removed=_removed,
+        added=_added,
+        affected=numpy.flatnonzero(numpy.isin(_new_keys // 256, _near)),
+    )
+
+
+def update_neighbours(old: RlyColumns, new: RlyColumns, changes: RlyChanges) -> None:
+    """Assign the neighbours of a new railway version from the old one.
+
+    Neighbours are only searched for the affected elements, those of every
+    other element being carried over from the old railway.
+
+    Parameters
+    ----------
+    old: RlyColumns
+        previous version of the railway, with neighbours assigned
+    new: RlyColumns
+        new version of the railway
+    changes: RlyChanges
+        pairing of old and new elements
+    """
+    _n_elements: int = len(new.element_id)
+    _new_of_old = numpy.full(len(old.element_id), -1, dtype=numpy.int64)
+    _kept = numpy.flatnonzero(changes.old_of_new >= 0)
+    _new_of_old[changes.old_of_new[_kept]] = _kept
+
+    _carried = numpy.ones(_n_elements, dtype=bool)
+    _carried[changes.affected] = False
+    _carried[changes.added] = False
+    _carried_rows = numpy.flatnonzero(_carried)
+
+    # Gather the old neighbour lists of carried elements as one flat array
+    _old_rows = changes.old_of_new[_carried_rows]
+    _old_counts = numpy.diff(old.neighbour_indptr)[_old_rows]
+    _offsets = numpy.repeat(
+        old.neighbour_indptr[_old_rows] - numpy.cumsum(_old_counts) + _old_counts,
+        _old_counts,
+    )
+    _carried_targets = _new_of_old[
+        old.neighbour_indices[_offsets + numpy.arange(_old_counts.sum())]
+    ]
+
+    _indptr, _indices = find_neighbours(
+        new.element_id, new.x, new.y, rows=changes.affected
+    )
+    _counts = numpy.diff(_indptr)
+    _counts[_carried_rows] = _old_counts
+
+    _sources = numpy.concatenate(
+        (
+            numpy.repeat(_carried_rows, _old_counts),
+            numpy.repeat(numpy.arange(_n_elements), numpy.diff(_indptr)),
+        )
+    )
+    _order = numpy.argsort(_sources, kind="stable")
+    new.neighbour_indptr = numpy.zeros(_n_elements + 1, dtype=numpy.int64)
+    numpy.cumsum(_counts, out=new.neighbour_indptr[1:])
+    new.neighbour_indices = numpy.concatenate((_carried_targets, _indices))[_order]
+
+
+def _name_strings(columns: RlyColumns, codes: numpy.ndarray) -> numpy.ndarray:
+    return numpy.array(columns.names + [None], dtype=object)[codes]
+
+
+def unchanged_elements(
+    old: RlyColumns, new: RlyColumns, changes: RlyChanges
+) -> numpy.ndarray:
+    """Find new elements identical to their old counterparts.
+
+    Elements must match in every attribute and lie outside the affected
+    cells, so that their neighbours are also unchanged.
+
+    Returns
+    -------
+    numpy.ndarray
+        indices of the unchanged new elements
+    """
+    _candidates = numpy.flatnonzero(changes.old_of_new >= 0)
+    _candidates = _candidates[~numpy.isin(_candidates, changes.affected)]
+    _old_rows = changes.old_of_new[_candidates]
+
+    _same = (
+        (old.length[_old_rows] == new.length[_candidates]).all(axis=1)
+        & (old.speed_limit[_old_rows] == new.speed_limit[_candidates]).all(axis=1)
+        & (old.signal[_old_rows] == new.signal[_candidates])
+    )
+    for names in ("location_name", "active_element_name"):
+        _same &= _name_strings(old, getattr(old, names)[_old_rows]) == _name_strings(
+            new, getattr(new, names)[_candidates]
+        )
+    return _candidates[_same]
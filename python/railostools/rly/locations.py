@@ -0,0 +1,141 @@
+import dataclasses
+import logging
+import os
+import typing
+
+import numpy
+
+from railostools.rly.port_graph import PortGraph
+from railostools.rly.routing import SearchTree
+
+_logger = logging.getLogger("RailOSTools.LocationMatrix")
+
+
+@dataclasses.dataclass
+class LocationMatrix:
+    """Distances and running times between every pair of locations.
+
+    Entry ``[i, j]`` of each matrix is for the quickest route from location
+    ``names[i]`` to ``names[j]``, unreachable pairs having a distance of -1
+    and an infinite time.
+    """
+
+    names: typing.List[str]
+    distance: numpy.ndarray
+    time: numpy.ndarray
+
+    def __post_init__(self) -> None:
+        self._index: typing.Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+
+    def index(self, location: str) -> int:
+        """Return the matrix row and column of a location"""
+        try:
+            return self._index[location]
+        except KeyError as e:
+            raise KeyError(f"No location named '{location}'") from e
+
+    def distance_between(self, origin: str, destination: str) -> int:
+        """Distance in metres of the quickest route between two locations"""
+        return int(self.distance[self.index(origin), self.index(destination)])
+
+    def time_between(self, origin: str, destination: str) -> float:
+        """Minimum running time in seconds between two locations"""
+        return float(self.time[self.index(origin), self.index(destination)])
+
+    def save(self, file_name: str, digest: str) -> None:
+        """Write the matrices to a NumPy ``.npz`` file.
+
+        Parameters
+        ----------
+        file_name: str
+            file to write
+        digest: str
+            identifier of the railway the matrices belong to
+        """
+        with open(file_name, "wb") as out_f:
+            numpy.savez(
+                out_f,
+                names=numpy.array(self.names),
+                distance=self.distance,
+                time=self.time,
+                digest=numpy.array(digest),
+            )
+
+    @classmethod
+    def load(cls, file_name: str, digest: str) -> typing.Optional["LocationMatrix"]:
+        """Read matrices from a NumPy ``.npz`` file.
+
+        Returns
+        -------
+        LocationMatrix | None
+            the matrices, None if the file does not exist or was written for
+            a different railway
+        """
+        if not os.path.exists(file_name):
+            return None
+
+        with numpy.load(file_name) as in_f:
+            if str(in_f["digest"]) != digest:
+                _logger.debug(f"Ignoring out of date location matrix '{file_name}'")
+                return None
+            return cls(
+                names=in_f["names"].tolist(),
+                distance=in_f["distance"],
+                time=in_f["time"],
+            )
+
+
+def compute_location_matrix(
+    graph: PortGraph,
+    locations: typing.Dict[str, numpy.ndarray],
+    search: typing.Callable[[str], SearchTree],
+) -> LocationMatrix:
+    """Find the quickest routes between every pair of locations.
+
+    Parameters
+    ----------
+    graph: PortGraph
+        the port graph of the railway
+    locations: Dict[str, numpy.ndarray]
+        indices of the elements forming each location
+    search: Callable[[str], SearchTree]
+        returns the search tree from all vertices of the named location
+
+    Returns
+    -------
+    LocationMatrix
+        distances and running times between all locations
+    """
+    _location_vertices = {name: graph.vertices(e) for name, e in locations.items()}
+    _names = [name for name, v in _location_vertices.items() if len(v)]
+    _vertices = [_location_vertices[name] for name in _names]
+
+    if not _names:
+        return LocationMatrix(
+            names=[],
+            distance=numpy.zeros((0, 0), dtype=numpy.int64),
+            time=numpy.zeros((0, 0)),
+        )
+
+    # Flatten the location vertices so that the closest vertex of each
+    # location is found with a single reduction per origin
+    _flat = numpy.concatenate(_vertices)
+    _starts = numpy.cumsum([0] + [len(v) for v in _vertices[:-1]])
+
+    _distance = numpy.full((len(_names), len(_names)), -1, dtype=numpy.int64)
+    _time = numpy.full((len(_names), len(_names)), numpy.inf)
+
+    for i, name in enumerate(_names):
+        _tree = search(name)
+        _times = _tree.time[_flat]
+        _time[i] = numpy.minimum.reduceat(_times, _starts)
+        _closest = numpy.array(
+            [
+                start + numpy.argmin(_times[start : start + len(v)])
+                for start, v in zip(_starts, _vertices)
+            ]
+        )
+        _reached = numpy.isfinite(_time[i])
+        _distance[i, _reached] = _tree.distance[_flat[_closest[_reached]]]
+
+    return LocationMatrix(names=_names, distance=_distance, time=_time)
@@ -1,6 +1,9 @@
+import collections
 import datetime
+import io
 import json
 import logging
+import math
 import os.path
 import dataclasses
 import pandas
@@ -8,19 +11,63 @@ import pydantic
 import semver
 import typing
 import igraph
-import itertools
-import tqdm
-import re
+import numpy
 import matplotlib.pyplot as plt
 
-from railostools.exceptions import RailwayParsingError
+from railostools.exceptions import RailwayParsingError, RoutingError
 from railostools.common.enumeration import Elements
-from railostools.rly.relations import can_connect
+from railostools.rly.adjacency import AdjacencyMatrix, adjacency_matrix
+from railostools.rly.batch import ParseResult, parse_many
+from railostools.rly.blocks import BlockGraph
+from railostools.rly.cache import (
+    RlyCache,
+    contents_digest,
+    load_railway,
+    save_railway,
+)
+from railostools.rly.columnar import SIGNAL_CODES, RlyColumns
+from railostools.rly.diagnostics import RlyDiagnostics, diagnose
+from railostools.rly.incremental import (
+    RlyChanges,
+    match_elements,
+    unchanged_elements,
+    update_neighbours,
+)
+from railostools.rly.locations import LocationMatrix, compute_location_matrix
+from railostools.rly.plotting import draw_railway
+from railostools.rly.port_graph import PortGraph
+from railostools.rly.routing import (
+    Route,
+    SearchTree,
+    k_shortest_paths,
+    running_times,
+    search,
+)
+from railostools.rly.segments import SegmentGraph
+from railostools.rly.spatial import SpatialIndex
+from railostools.rly.relations import (
+    CONNECTIONS,
+    EXITS,
+    MIRRORED_PORTS,
+    POINTS,
+    PORT_OFFSETS,
+)
+from railostools.rly.tokenizer import (
+    ActiveRecord,
+    InactiveRecord,
+    TextRecord,
+    tokenize_contents,
+)
 import railostools.exceptions as railos_exc
 from pydantic import Field
 from typing import List
 from typing_extensions import Annotated
 
+# Approximate memory held per active element by the element models, and by
+# the node map and position indices, used to estimate the size of a railway
+_MODEL_BYTES_PER_ELEMENT: int = 1400
+_INDEX_BYTES_PER_ELEMENT: int = 320
+
 
 def coordinate_to_position_identifier(position: typing.Tuple[int, int]) -> str:
     return (
@@ -34,6 +81,24 @@ class RlyInfoTables:
     signals: pandas.DataFrame
 
 
+@dataclasses.dataclass
+class RlySummary:
+    program_version: str
+    n_active_elements: int
+    n_inactive_elements: typing.Optional[int]
+    n_signals: int
+    n_points: int
+    n_level_crossings: int
+    n_stations: int
+
+
+@dataclasses.dataclass
+class RlyStoreStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
 @dataclasses.dataclass
 class StartPosition:
     start_coordinate: typing.Tuple[int, int]
@@ -119,149 +184,491 @@ class RlyData(pydantic.BaseModel):
 class RlyParser:
     _logger = logging.getLogger("RailOSTools.RlyParser")
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        columnar: bool = False,
+        cache_dir: typing.Optional[str] = None,
+        max_railways: typing.Optional[int] = None,
+        max_bytes: typing.Optional[int] = None,
+    ) -> None:
+        """Create a new railway parser.
+
+        Parameters
+        ----------
+        columnar: bool, optional
+            if True, only the columnar representation of each railway is built
+            on parsing and the element models are created on first access
+        cache_dir: str, optional
+            directory in which to cache parsed railways, if given files
+            parsed previously are loaded from the cache rather than re-parsed
+        max_railways: int, optional
+            maximum number of railways to hold, the least recently used
+            railway being evicted when exceeded
+        max_bytes: int, optional
+            approximate memory budget for held railways, the least recently
+            used railways being evicted when exceeded
+
+        The most recently parsed railway is never evicted.
+        """
         self._logger.debug("Creating new RlyParser")
+        self._columnar = columnar
+        self._cache: typing.Optional[RlyCache] = (
+            RlyCache(cache_dir) if cache_dir else None
+        )
         self._rly_data: typing.Dict[str, RlyData] = {}
+        self._columns: typing.OrderedDict[str, RlyColumns] = collections.OrderedDict()
+        self._max_railways = max_railways
+        self._max_bytes = max_bytes
+        self._store_stats = RlyStoreStats()
+        self._derived: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
         self._start_time: datetime.time = None
         self._current_file = None
         self._node_map: typing.Dict[str, igraph.Graph] = {}
-
-    def parse(self, rly_file: str) -> None:
+        self._vertex_ids: typing.Dict[
+            str, typing.Dict[typing.Tuple[int, int], int]
+        ] = {}
+        self._element_index: typing.Dict[
+            str, typing.Dict[typing.Tuple[int, int], int]
+        ] = {}
+        # Digest of the content each railway was read from
+        self._digests: typing.Dict[str, str] = {}
+
+    def parse(self, rly_file: str, incremental: bool = False) -> None:
+        """Parse a railway file.
+
+        Parameters
+        ----------
+        rly_file: str
+            path of the railway file to parse
+        incremental: bool, optional
+            if True and an earlier version of the railway is held, only the
+            neighbours of elements in and around changed cells are found
+            again, unchanged element models are reused and the railway graph
+            is patched in place
+        """
         self._logger.info(f"Parsing RLY file '{rly_file}'")
         if not os.path.exists(rly_file):
             raise FileNotFoundError(
                 f"Cannot parse railway file '{rly_file}', file does not exist."
             )
 
-        if not open(rly_file).readlines():
-            raise railos_exc.ParsingError("Cannot parse empty file.")
-
         _key = os.path.splitext(os.path.basename(rly_file))[0]
-        self._rly_data[_key] = self._get_rly_components(
-            open(rly_file, encoding="latin-1").readlines()
-        )
+        _cached = None
+        _changes: typing.Optional[RlyChanges] = None
+
+        # The file is read once so that the digest matches what is parsed
+        # even if the file is changed in the meantime
+        with open(rly_file, "rb") as in_f:
+            _contents = in_f.read()
+        _digest = contents_digest(_contents)
 
-        if not self._rly_data[_key]:
-            raise railos_exc.ParsingError("Failed to retrieve data from file.")
+        if self._cache:
+            _cached = self._cache.load(_digest)
 
-        self._current_file = rly_file
+        if _cached:
+            self._logger.debug(f"Loaded railway '{_key}' from cache")
+            _columns, _edges = _cached
+        else:
+            _columns = RlyColumns.from_records(tokenize_contents(_contents))
+            if incremental and _key in self._columns:
+                _changes = match_elements(self._columns[_key], _columns)
+                update_neighbours(self._columns[_key], _columns, _changes)
+            else:
+                _columns.assign_neighbours()
+            _edges = _columns.edges()
+
+        self._add_railway(_key, rly_file, _columns, _edges, _digest, _changes)
+
+        if self._cache and not _cached:
+            self._cache.store(_digest, _columns, _edges)
 
-        self._assign_neighbours()
-        self._node_map[_key] = self._build_node_map()
+        self._evict()
 
         self._logger.info("Parsing successful, railway is valid.")
 
+    def parse_many(
+        self,
+        rly_files: typing.Iterable[str],
+        workers: typing.Optional[int] = None,
+    ) -> typing.List[ParseResult]:
+        """Parse many railway files in parallel worker processes.
+
+        Successfully parsed railways are added to the parser as if parsed
+        one at a time, the last becoming the current railway. Element models
+        are only built when first needed, as for a columnar parser, so that
+        little work is left to the calling process. Files which fail to parse
+        or be added are reported in the results rather than raising.
+
+        Parameters
+        ----------
+        rly_files: Iterable[str]
+            railway files to parse
+        workers: int, optional
+            number of worker processes, by default one per CPU
+
+        Returns
+        -------
+        List[ParseResult]
+            timing, columns and any error for each file in the order given
+        """
+        _results = parse_many(rly_files, workers)
+
+        for result in _results:
+            if not result.ok:
+                self._logger.warning(
+                    f"Failed to parse RLY file '{result.path}': {result.error}"
+                )
+                continue
+            try:
+                self._add_railway(
+                    os.path.splitext(os.path.basename(result.path))[0],
+                    result.path,
+                    result.columns,
+                    result.columns.edges(),
+                    result.digest,
+                    lazy=True,
+                )
+            except Exception as e:
+                # As in the workers, one bad file must not end the batch
+                result.error = f"{type(e).__name__}: {e}"
+                self._logger.warning(
+                    f"Failed to add railway '{result.path}': {result.error}"
+                )
+                continue
+            self._evict()
+
+        return _results
+
+    def save_graph(self, output_file: str) -> None:
+        """Save the current railway and its graph to a NumPy ``.npz`` file.
+
+        The file holds everything needed to restore the railway with
+        ``load_graph`` without access to the original railway file.
+
+        Parameters
+        ----------
+        output_file: str
+            file to write
+        """
+        if not self._current_file:
+            raise RailwayParsingError("No file has been parsed yet")
+        save_railway(output_file, self.columns, self.columns.edges())
+
+    def load_graph(self, graph_file: str) -> None:
+        """Load a railway previously written by ``save_graph``.
+
+        The railway is added under the name of the file, without extension,
+        and becomes the current railway as if it had been parsed.
+
+        Parameters
+        ----------
+        graph_file: str
+            file to read
+        """
+        if not os.path.exists(graph_file):
+            raise FileNotFoundError(
+                f"Cannot load railway graph '{graph_file}', file does not exist."
+            )
+        _key = os.path.splitext(os.path.basename(graph_file))[0]
+        with open(graph_file, "rb") as in_f:
+            _contents = in_f.read()
+        self._add_railway(
+            _key,
+            graph_file,
+            *load_railway(io.BytesIO(_contents)),
+            contents_digest(_contents),
+        )
+        self._evict()
+
+    def _add_railway(
+        self,
+        key: str,
+        source_file: str,
+        columns: RlyColumns,
+        edges: numpy.ndarray,
+        digest: str,
+        changes: typing.Optional[RlyChanges] = None,
+        lazy: bool = False,
+    ) -> None:
+        """Hold a railway under a key, replacing anything derived from it.
+
+        The digest identifies the content the railway was read from, keying
+        anything derived from it which is saved to disk.
+
+        If ``changes`` relates the railway to the version currently held,
+        unchanged element models are reused and the graph is patched. If
+        ``lazy``, element models are only built when first needed, as for a
+        columnar parser.
+
+        A new railway is built in full before anything is held, so that a
+        failure leaves the parser as it was.
+        """
+        _reused: typing.Dict[int, ActiveElement] = {}
+        if changes and key in self._rly_data:
+            _previous = self._rly_data[key].active_elements
+            _unchanged = unchanged_elements(self._columns[key], columns, changes)
+            _reused = {i: _previous[changes.old_of_new[i]] for i in _unchanged.tolist()}
+
+        _rly_data: typing.Optional[RlyData] = None
+        if not self._columnar and not lazy:
+            _rly_data = self._get_rly_components(columns, _reused)
+
+        _element_index = self._build_element_index(columns)
+        if (
+            changes
+            and key in self._node_map
+            and (changes.keeps_indices or changes.preserves_order)
+        ):
+            _node_map = self._node_map[key]
+            self._patch_node_map(_node_map, columns, edges, changes)
+            _vertex_ids = self._build_vertex_ids(columns)
+        else:
+            _node_map, _vertex_ids = self._build_node_map(columns, edges)
+
+        self._rly_data.pop(key, None)
+        self._derived.pop(key, None)
+        if _rly_data is not None:
+            self._rly_data[key] = _rly_data
+
+        self._columns[key] = columns
+        self._touch(key)
+        self._current_file = source_file
+        self._digests[key] = digest
+        self._element_index[key] = _element_index
+        self._node_map[key] = _node_map
+        self._vertex_ids[key] = _vertex_ids
+
     def keys(self):
-        return self._rly_data.keys()
+        return self._columns.keys()
 
     def __getitem__(self, item) -> RlyData:
-        return self._rly_data[item]
+        if item not in self._columns:
+            self._store_stats.misses += 1
+            raise KeyError(item)
+
+        self._store_stats.hits += 1
+        return self._railway_data(self._touch(item))
+
+    def _touch(self, key: str) -> str:
+        """Mark a held railway as the most recently used"""
+        self._columns.move_to_end(key)
+        return key
+
+    def _railway_data(self, key: str) -> RlyData:
+        """Element models of a held railway, constructing them if needed"""
+        if key not in self._rly_data:
+            self._rly_data[key] = self._get_rly_components(self._columns[key])
+            self._evict(keep=key)
+        return self._rly_data[key]
+
+    @property
+    def store_stats(self) -> RlyStoreStats:
+        """Lookup hit, miss and eviction counts for the held railways"""
+        return dataclasses.replace(self._store_stats)
+
+    def railway_nbytes(self, key: str) -> int:
+        """Approximate memory held for a parsed railway"""
+        _columns = self._columns[key]
+        _n_elements = len(_columns.element_id) + len(_columns.inactive_element_id)
+        _nbytes = _columns.nbytes + _n_elements * _INDEX_BYTES_PER_ELEMENT
+        if key in self._rly_data:
+            _nbytes += _n_elements * _MODEL_BYTES_PER_ELEMENT
+        return _nbytes
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held for all parsed railways"""
+        return sum(self.railway_nbytes(key) for key in self._columns)
+
+    def _over_capacity(self) -> bool:
+        if self._max_railways is not None and len(self._columns) > self._max_railways:
+            return True
+        return self._max_bytes is not None and self.nbytes > self._max_bytes
+
+    def _evict(self, keep: typing.Optional[str] = None) -> None:
+        """Remove least recently used railways until within capacity"""
+        # Found from the file directly as reading _current_key would mark
+        # the current railway as used
+        _current = os.path.splitext(os.path.basename(self._current_file))[0]
+        _protected = {_current, keep}
+        for key in list(self._columns):
+            if not self._over_capacity():
+                break
+            if key in _protected:
+                continue
+            self._logger.debug(f"Evicting railway '{key}'")
+            for store in (
+                self._columns,
+                self._rly_data,
+                self._derived,
+                self._node_map,
+                self._vertex_ids,
+                self._element_index,
+                self._digests,
+            ):
+                store.pop(key, None)
+            self._store_stats.evictions += 1
 
     @property
     def n_active_elements(self) -> int:
         if not self._current_file:
             raise RailwayParsingError("No file has been parsed yet")
-        return self._rly_data[
-            os.path.splitext(os.path.basename(self._current_file))[0]
-        ].metadata.n_active_elements
+        return self.columns.n_active_elements
 
     @property
     def n_inactive_elements(self) -> int:
         if not self._current_file:
             raise RailwayParsingError("No file has been parsed yet")
-        return self._rly_data[
-            os.path.splitext(os.path.basename(self._current_file))[0]
-        ].metadata.n_inactive_elements
+        return self.columns.n_inactive_elements
 
     @property
     def program_version(self) -> str:
         if not self._current_file:
             raise RailwayParsingError("No file has been parsed yet")
-        return self._rly_data[
-            os.path.splitext(os.path.basename(self._current_file))[0]
-        ].metadata.program_version
+        return self.columns.program_version
+
+    def _memoise(
+        self, name: str, compute: typing.Callable[[], typing.Any]
+    ) -> typing.Any:
+        """Return a derived value for the current railway, computing it once.
+
+        Values are held until the railway is next parsed.
+        """
+        _derived = self._derived.setdefault(self._current_key, {})
+        if name not in _derived:
+            _derived[name] = compute()
+        return _derived[name]
 
     @property
     def n_signals(self) -> int:
-        return self.tables.signals.size
+        return self._memoise("n_signals", lambda: len(self.tables.signals))
 
     @property
     def n_level_crossings(self) -> int:
-        return len(
-            [i for i in self.active_elements if i.element_id == Elements.Level_Crossing]
+        return self._memoise(
+            "n_level_crossings",
+            lambda: self.columns.count((Elements.Level_Crossing,)),
         )
 
     @property
     def n_stations(self) -> int:
-        return len(self.named_locations)
+        return self._memoise("n_stations", lambda: len(self.named_locations))
 
     @property
     def n_points(self) -> int:
-        _points: typing.List[ActiveElement] = [
-            i
-            for i in self.active_elements
-            if i.element_id
-            in (
-                Elements.Junction_Right_Up_RightAngle,
-                Elements.Junction_Left_Up_RightAngle,
-                Elements.Junction_Right_Down_RightAngle,
-                Elements.Junction_Left_Down_RightAngle,
-                Elements.Junction_Up_Left_RightAngle,
-                Elements.Junction_Up_Right_RightAngle,
-                Elements.Junction_Down_Left_RightAngle,
-                Elements.Junction_Down_Right_RightAngle,
-                Elements.Junction_Right_Up_45Angle,
-                Elements.Junction_Left_Up_45Angle,
-                Elements.Junction_Right_Down_45Angle,
-                Elements.Junction_Left_Down_45Angle,
-                Elements.Junction_Up_Left_45Angle,
-                Elements.Junction_Up_Right_45Angle,
-                Elements.Junction_Down_Left_45Angle,
-                Elements.Junction_Down_Right_45Angle,
-                Elements.Junction_DiagonalDown_Up_45Angle,
-                Elements.Junction_DiagonalUp_Up_45Angle,
-                Elements.Junction_DiagonalUp_Down_45Angle,
-                Elements.Junction_DiagonalDown_Down_45Angle,
-                Elements.Junction_DiagonalDown_Left_45Angle,
-                Elements.Junction_DiagonalUp_Right_45Angle,
-                Elements.Junction_DiagonalUp_Left_45Angle,
-                Elements.Junction_DiagonalDown_Right_45Angle,
-            )
-        ]
-        return len(_points)
+        return self._memoise("n_points", lambda: self.columns.count(POINTS))
+
+    def summary(self) -> RlySummary:
+        """Return all element counts for the current railway.
+
+        Element type and signal counts are found from a single pass over the
+        element columns, with the results memoised as for the individual
+        properties.
+        """
+        _columns = self.columns
+        _type_counts = numpy.bincount(_columns.element_id, minlength=max(Elements) + 1)
+        _derived = self._derived.setdefault(self._current_key, {})
+        _derived.setdefault("n_points", int(_type_counts[list(POINTS)].sum()))
+        _derived.setdefault(
+            "n_level_crossings", int(_type_counts[Elements.Level_Crossing])
+        )
+        _derived.setdefault("n_signals", int(numpy.count_nonzero(_columns.signal)))
+
+        return RlySummary(
+            program_version=_columns.program_version,
+            n_active_elements=_columns.n_active_elements,
+            n_inactive_elements=_columns.n_inactive_elements,
+            n_signals=_derived["n_signals"],
+            n_points=_derived["n_points"],
+            n_level_crossings=_derived["n_level_crossings"],
+            n_stations=self.n_stations,
+        )
+
+    @property
+    def _current_key(self) -> str:
+        """Key of the current railway, marking it as the most recently used"""
+        if not self._current_file:
+            raise RailwayParsingError("No file has been parsed yet")
+        return self._touch(os.path.splitext(os.path.basename(self._current_file))[0])
 
     def get_element_at(
         self, coordinates: typing.Tuple[int, int]
     ) -> typing.Optional[Elements]:
-        for element in self.active_elements + self.inactive_elements:
-            if tuple(element.position) == tuple(coordinates):
-                if _id := element.element_id:
-                    return Elements(_id)
+        if _id := self._element_index[self._current_key].get(tuple(coordinates)):
+            return Elements(_id)
         return None
 
     def get_element_connected_neighbours(
         self, coordinates: typing.Tuple[int, int]
     ) -> typing.List[typing.Tuple[int, int]]:
+        """Return the coordinates of the elements joined to the given element.
+
+        Only the cells the element's connection ports point to are probed, a
+        neighbour being connected if it has the mirrored port.
+        """
         if not (_this_element := self.get_element_at(coordinates)):
             raise RailwayParsingError(f"No element found at '{coordinates}'")
-        _neighbour_coords = (
-            (coordinates[0], coordinates[1] + 1),
-            (coordinates[0], coordinates[1] - 1),
-            (coordinates[0] + 1, coordinates[1]),
-            (coordinates[0] - 1, coordinates[1]),
-            (coordinates[0] + 1, coordinates[1] + 1),
-            (coordinates[0] - 1, coordinates[1] + 1),
-            (coordinates[0] + 1, coordinates[1] - 1),
-            (coordinates[0] - 1, coordinates[1] - 1),
-        )
 
-        _found_neighbours = [i for i in _neighbour_coords if self.get_element_at(i)]
+        _neighbours: typing.List[typing.Tuple[int, int]] = []
+
+        for port in CONNECTIONS[_this_element]:
+            _offset = PORT_OFFSETS[port]
+            _coord = (coordinates[0] + _offset[0], coordinates[1] + _offset[1])
+            if not (_neighbour := self.get_element_at(_coord)):
+                continue
+            if MIRRORED_PORTS[port] in CONNECTIONS[_neighbour]:
+                _neighbours.append(_coord)
+
+        return _neighbours
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """Index of the positions of all active, inactive and text elements"""
+        return self._memoise(
+            "spatial_index", lambda: SpatialIndex.from_columns(self.columns)
+        )
 
-        return [
-            i
-            for i in _found_neighbours
-            if can_connect(_this_element, self.get_element_at(i), coordinates, i)
-        ]
+    def get_elements_in_window(
+        self,
+        bottom_left: typing.Tuple[float, float],
+        top_right: typing.Tuple[float, float],
+        kinds: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.List[typing.Tuple[str, int]]:
+        """Find the elements lying within a rectangle of the railway.
+
+        Text positions are converted from pixels to element coordinates.
+
+        Parameters
+        ----------
+        bottom_left: Tuple[float, float]
+            lowest coordinates of the rectangle
+        top_right: Tuple[float, float]
+            highest coordinates of the rectangle
+        kinds: Iterable[str], optional
+            any of 'active', 'inactive' and 'text', by default all
+
+        Returns
+        -------
+        List[Tuple[str, int]]
+            kind of each element and its index within ``active_elements``,
+            ``inactive_elements`` or the railway text
+        """
+        return self.spatial_index.window(bottom_left, top_right, kinds)
+
+    def get_nearest_elements(
+        self,
+        coordinates: typing.Tuple[float, float],
+        k: int = 1,
+        kinds: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.List[typing.Tuple[str, int, float]]:
+        """Find the k elements closest to a position.
+
+        Returns
+        -------
+        List[Tuple[str, int, float]]
+            kind, index and distance of each element, closest first
+        """
+        return self.spatial_index.nearest(coordinates, k, kinds)
 
     @property
     def named_locations(self) -> typing.Dict[str, TimetableLocation]:
@@ -271,68 +678,42 @@ class RlyParser:
         start and end point within the location region. Track sections outside
         of the domain of the location cannot be easily identified using this method.
         """
+        return self._memoise("named_locations", self._find_named_locations)
 
-        # Retrieve timetable location names from data
-        _location_names: typing.Set[str] = {
-            n.active_element_name
-            for n in self._rly_data[
-                os.path.splitext(os.path.basename(self._current_file))[0]
-            ].active_elements
-            if n.active_element_name
-        }
+    def _find_named_locations(self) -> typing.Dict[str, TimetableLocation]:
+        _columns = self.columns
+        _positions: typing.List[typing.Tuple[int, int]] = list(
+            zip(_columns.x.tolist(), _columns.y.tolist())
+        )
 
-        # Remove the -1 location if present
-        if "-1" in _location_names:
-            _location_names.remove("-1")
-
-        _locations: typing.Dict[str, TimetableLocation] = {}
-
-        # Iterate through all location names and find the coordinate pairs from which a
-        # timetable could commence
-        for location in _location_names:
-            _locations[location] = TimetableLocation(location, [])
-            _loc_elements: typing.Dict = {"element_types": [], "element_coords": []}
-
-            # Iterate though all elements and collect the data needed for finding
-            # timetable locations
-            for element in self.active_elements:
-                if element.active_element_name != location:
-                    continue
-                if not (element_int := element.element_id):
-                    continue
-                element_type: Elements = Elements(element_int)
-                _loc_elements["element_types"].append(element_type)
-                _loc_elements["element_coords"].append(element.position)
-
-            # Get every combination of two elements for this location
-            _combos = set(
-                itertools.combinations(range(len(_loc_elements["element_types"])), 2)
-            )
+        # Group element indices by timetable location name, removing the
+        # -1 location if present
+        _groups: typing.Dict[str, numpy.ndarray] = _columns.group_by_name()
+        _groups.pop("-1", None)
 
-            for indices in _combos:
-                if len(_loc_elements["element_types"]) < 2:
-                    continue
-                _combo_type: typing.Tuple[typing.Tuple[Elements, Elements]] = (
-                    _loc_elements["element_types"][indices[0]],
-                    _loc_elements["element_types"][indices[1]],
-                )
+        _locations: typing.Dict[str, TimetableLocation] = {
+            location: TimetableLocation(location, []) for location in _groups
+        }
 
-                _combo_coords: typing.Tuple[typing.Tuple[Elements, Elements]] = (
-                    _loc_elements["element_coords"][indices[0]],
-                    _loc_elements["element_coords"][indices[1]],
-                )
+        # A timetable can commence from any two connected elements within the
+        # same location, these pairs being taken from the neighbour adjacency
+        _codes = _columns.active_element_name
+        _sources = numpy.repeat(
+            numpy.arange(len(_codes)), numpy.diff(_columns.neighbour_indptr)
+        )
+        _targets = _columns.neighbour_indices
+        _pairs = (
+            (_sources < _targets)
+            & (_codes[_sources] >= 0)
+            & (_codes[_sources] == _codes[_targets])
+        )
 
-                # Check if this combination contains two elements which can
-                # be joined together
-                if can_connect(
-                    element_one_type=_combo_type[0],
-                    element_two_type=_combo_type[1],
-                    coord_1=_combo_coords[0],
-                    coord_2=_combo_coords[1],
-                ):
-                    _locations[location].start_positions.append(
-                        StartPosition(_combo_coords[0], _combo_coords[1])
-                    )
+        for source, target in zip(_sources[_pairs].tolist(), _targets[_pairs].tolist()):
+            if (location := _columns.name(_codes[source])) not in _locations:
+                continue
+            _locations[location].start_positions.append(
+                StartPosition(_positions[source], _positions[target])
+            )
 
         return _locations
 
@@ -340,191 +721,593 @@ class RlyParser:
     def data(self) -> typing.Dict[str, RlyData]:
         if not self._current_file:
             raise RailwayParsingError("No file has been parsed yet")
-        return self._rly_data
+        # Materialising models may evict other railways when a memory budget
+        # is set, so iterate over a snapshot and skip any no longer held
+        return {
+            key: self._railway_data(key)
+            for key in list(self.keys())
+            if key in self._columns
+        }
+
+    @property
+    def columns(self) -> RlyColumns:
+        """Columnar representation of the current railway"""
+        if not self._current_file:
+            raise RailwayParsingError("No file has been parsed yet")
+        return self._columns[self._current_key]
 
     @property
     def active_elements(self) -> typing.List[ActiveElement]:
-        return self.data[
-            os.path.splitext(os.path.basename(self._current_file))[0]
-        ].active_elements
+        return self._railway_data(self._current_key).active_elements
 
     @property
     def inactive_elements(self) -> typing.List[InactiveElement]:
-        return self.data[
-            os.path.splitext(os.path.basename(self._current_file))[0]
-        ].inactive_elements
+        return self._railway_data(self._current_key).inactive_elements
 
     @property
     def nodes(self) -> igraph.Graph:
-        return self._node_map[os.path.splitext(os.path.basename(self._current_file))[0]]
+        return self._node_map[self._current_key]
+
+    @property
+    def vertex_ids(self) -> typing.Dict[typing.Tuple[int, int], int]:
+        """Mapping from element coordinates to vertex identifiers in ``nodes``"""
+        return self._vertex_ids[self._current_key]
+
+    def adjacency(self, format: str = "csr", weight: str = "length") -> AdjacencyMatrix:
+        """Sparse adjacency matrix of the active elements.
+
+        Unlike ``nodes`` this is built directly from the neighbour arrays,
+        for use with array based graph algorithms.
+
+        Parameters
+        ----------
+        format: str, optional
+            sparse matrix layout, currently only 'csr'
+        weight: str, optional
+            weight entries by 'length' in metres or running 'time' in seconds
+
+        Returns
+        -------
+        AdjacencyMatrix
+            index pointer, index and weight arrays along with the position
+            of the element for each row
+        """
+        if format != "csr":
+            raise ValueError(f"Unsupported adjacency matrix format '{format}'")
+        _matrices: typing.Dict[str, AdjacencyMatrix] = self._memoise("adjacency", dict)
+        if weight not in _matrices:
+            _matrices[weight] = adjacency_matrix(self.columns, weight)
+        return _matrices[weight]
+
+    @property
+    def port_graph(self) -> igraph.Graph:
+        """Directed graph of legal train movements through the railway.
+
+        Unlike ``nodes``, which has one vertex per element, there is one
+        vertex per element and entry port so that every path through the
+        graph is a legal movement, e.g. never passing from one leg of a set
+        of points to the other.
+        """
+        return self._memoise(
+            "port_graph", lambda: self._port_graph().to_igraph(self.columns)
+        )
+
+    def _port_graph(self) -> PortGraph:
+        return self._memoise(
+            "port_graph_arrays", lambda: PortGraph.from_columns(self.columns)
+        )
+
+    def _location_elements(
+        self, location: typing.Union[str, typing.Tuple[int, int]]
+    ) -> numpy.ndarray:
+        """Return the indices of the elements making up a route end point"""
+        if isinstance(location, str):
+            if (_group := self.columns.group_by_name().get(location)) is None:
+                raise RoutingError(f"No location named '{location}'")
+            return _group
+        if (_element := self.vertex_ids.get(tuple(location))) is None:
+            raise RoutingError(f"No active element at position {tuple(location)}")
+        return numpy.array([_element])
+
+    def _search_tree(
+        self, origin: typing.Union[str, typing.Tuple[int, int]]
+    ) -> SearchTree:
+        _trees: typing.Dict[typing.Any, SearchTree] = self._memoise("route_trees", dict)
+        _key = origin if isinstance(origin, str) else tuple(origin)
+        if _key not in _trees:
+            _graph = self._port_graph()
+            _trees[_key] = search(
+                _graph, _graph.vertices(self._location_elements(origin)).tolist()
+            )
+        return _trees[_key]
+
+    def route(
+        self,
+        origin: typing.Union[str, typing.Tuple[int, int]],
+        destination: typing.Union[str, typing.Tuple[int, int]],
+    ) -> Route:
+        """Find the quickest legal route between two points on the railway.
+
+        Running times are the minimum possible, each element being traversed
+        at its speed limit. The search from each origin is kept so that
+        further routes from the same origin need no new search.
+
+        Parameters
+        ----------
+        origin: str | Tuple[int, int]
+            named location or element coordinates to start from
+        destination: str | Tuple[int, int]
+            named location or element coordinates to finish at
+
+        Returns
+        -------
+        Route
+            element positions along the route, the distance covered in metres
+            and running time in seconds up to reaching the destination
+        """
+        _routes: typing.Dict[typing.Any, Route] = self._memoise("routes", dict)
+        _key = tuple(
+            i if isinstance(i, str) else tuple(i) for i in (origin, destination)
+        )
+        if _key in _routes:
+            return _routes[_key]
+
+        _graph = self._port_graph()
+        _tree = self._search_tree(origin)
+        _targets = _graph.vertices(self._location_elements(destination))
+        _target = _targets[numpy.argmin(_tree.time[_targets])]
+
+        if not numpy.isfinite(_tree.time[_target]):
+            raise RoutingError(f"No route from {origin} to {destination}")
+
+        _positions = self.columns.positions[_graph.element[_tree.path(_target)]]
+        _routes[_key] = Route(
+            path=[tuple(p) for p in _positions.tolist()],
+            distance=int(_tree.distance[_target]),
+            time=float(_tree.time[_target]),
+        )
+        return _routes[_key]
+
+    def alternative_routes(
+        self,
+        origin: typing.Union[str, typing.Tuple[int, int]],
+        destination: typing.Union[str, typing.Tuple[int, int]],
+        k: int = 3,
+        weight: str = "time",
+        max_cost: float = math.inf,
+    ) -> typing.List[Route]:
+        """Find up to k distinct routes between two points on the railway.
+
+        Routes never pass through the same element and port twice, and are
+        ranked from the quickest or shortest. The first is the route given
+        by ``route`` when ranking by time.
+
+        Parameters
+        ----------
+        origin: str | Tuple[int, int]
+            named location or element coordinates to start from
+        destination: str | Tuple[int, int]
+            named location or element coordinates to finish at
+        k: int, optional
+            maximum number of routes to return, none if zero or less
+        weight: str, optional
+            rank routes by 'time' in seconds or 'distance' in metres
+        max_cost: float, optional
+            routes with a time or distance above this are not considered,
+            bounding the search on large railways
+
+        Returns
+        -------
+        List[Route]
+            the routes found, best first
+        """
+        if weight not in ("time", "distance"):
+            raise ValueError(f"Expected weight 'time' or 'distance', got '{weight}'")
+
+        _graph = self._port_graph()
+        _times = running_times(_graph)
+        _paths = k_shortest_paths(
+            _graph,
+            _graph.vertices(self._location_elements(origin)),
+            _graph.vertices(self._location_elements(destination)),
+            k,
+            _times if weight == "time" else _graph.lengths,
+            max_cost,
+            # Paths differing only in the ports used at each end are one route
+            key=lambda path: tuple(_graph.element[path].tolist()),
+        )
+
+        _routes: typing.List[Route] = []
+        for _, path in _paths:
+            _edges = self._path_edges(path)
+            _positions = self.columns.positions[_graph.element[path]]
+            _routes.append(
+                Route(
+                    path=[tuple(p) for p in _positions.tolist()],
+                    distance=int(_graph.lengths[_edges].sum()),
+                    time=float(_times[_edges].sum()),
+                )
+            )
+        return _routes
+
+    def _path_edges(self, path: typing.List[int]) -> numpy.ndarray:
+        """Return the port graph edges joining consecutive path vertices"""
+        _graph = self._port_graph()
+        return numpy.array(
+            [
+                _graph.indptr[u]
+                + _graph.indices[_graph.indptr[u] : _graph.indptr[u + 1]]
+                .tolist()
+                .index(v)
+                for u, v in zip(path[:-1], path[1:])
+            ],
+            dtype=numpy.int64,
+        )
+
+    def location_matrix(self, persist: bool = True) -> LocationMatrix:
+        """Distances and running times between all locations and exits.
+
+        Locations are the named timetable locations and any unnamed exits,
+        the latter labelled by their position identifier. The matrices are
+        computed with one search per location and saved beside the railway
+        file, being loaded from there in future if the railway is unchanged.
+
+        Parameters
+        ----------
+        persist: bool, optional
+            whether to save the matrices beside the railway file if not
+            already saved
+        """
+        _matrix = self._memoise("location_matrix", self._load_location_matrix)
+        _derived = self._derived[self._current_key]
+        _digest = self._digests[self._current_key]
+        # A failed save is only reported once rather than retried on every call
+        if persist and not _derived.get("location_matrix_saved"):
+            _derived["location_matrix_saved"] = True
+            try:
+                _matrix.save(self._location_matrix_file(), _digest)
+            except OSError as e:
+                self._logger.warning(f"Failed to save location matrix: {e}")
+        return _matrix
+
+    def _location_matrix_file(self) -> str:
+        return f"{os.path.splitext(self._current_file)[0]}.locations.npz"
+
+    def _load_location_matrix(self) -> LocationMatrix:
+        _digest = self._digests[self._current_key]
+        if _matrix := LocationMatrix.load(self._location_matrix_file(), _digest):
+            self._derived[self._current_key]["location_matrix_saved"] = True
+            return _matrix
+
+        _origins: typing.Dict[str, typing.Union[str, typing.Tuple[int, int]]] = {
+            name: name for name in self.columns.group_by_name() if name != "-1"
+        }
+        _exits = numpy.flatnonzero(numpy.isin(self.columns.element_id, EXITS))
+        for exit_index in _exits[self.columns.active_element_name[_exits] < 0]:
+            _position = tuple(self.columns.positions[exit_index].tolist())
+            _origins[coordinate_to_position_identifier(_position)] = _position
+
+        return compute_location_matrix(
+            self._port_graph(),
+            {name: self._location_elements(o) for name, o in _origins.items()},
+            lambda name: self._search_tree(_origins[name]),
+        )
+
+    @property
+    def diagnostics(self) -> RlyDiagnostics:
+        """Connectivity problems within the railway.
+
+        Lists the connected components of the network, connection ports
+        without a neighbour and exits from which no named location can be
+        reached.
+        """
+        return self._memoise(
+            "diagnostics",
+            lambda: diagnose(
+                self._port_graph(),
+                self.columns,
+                {
+                    name: group
+                    for name, group in self.columns.group_by_name().items()
+                    if name != "-1"
+                },
+            ),
+        )
+
+    @property
+    def segment_graph(self) -> igraph.Graph:
+        """Railway graph with runs of plain track collapsed into single edges.
+
+        Points, crossings, signals, buffers, exits and the boundaries of
+        named locations remain as vertices. Each edge holds the length and
+        lowest speed limit of the track between the centres of its end
+        elements, along with the positions of the elements it replaces.
+        """
+        return self._memoise(
+            "segment_graph", lambda: self._segment_graph().to_igraph(self.columns)
+        )
+
+    def _segment_graph(self) -> SegmentGraph:
+        return self._memoise(
+            "segment_graph_arrays", lambda: SegmentGraph.from_columns(self.columns)
+        )
+
+    @property
+    def block_graph(self) -> igraph.Graph:
+        """Directed graph of the signal blocks of the railway.
+
+        Each vertex is the track a train may run over after passing a signal,
+        or entering at an exit, up to the next signal in its direction of
+        travel, holding its length and lowest speed limit. Edges join each
+        block to those that follow it.
+        """
+        return self._memoise(
+            "block_graph", lambda: self._block_graph().to_igraph(self.columns)
+        )
+
+    def _block_graph(self) -> BlockGraph:
+        return self._memoise(
+            "block_graph_arrays",
+            lambda: BlockGraph.from_port_graph(self._port_graph(), self.columns),
+        )
+
+    def get_segment_at(
+        self, position: typing.Tuple[int, int]
+    ) -> typing.Optional[typing.Tuple[str, int]]:
+        """Find the segment graph vertex or edge covering a position.
+
+        Returns
+        -------
+        Tuple[str, int] | None
+            ``("vertex", i)`` or ``("edge", j)`` for the vertex or edge of
+            ``segment_graph`` covering the position, None if there is no
+            active element there
+        """
+        if (_vertex := self.vertex_ids.get(tuple(position))) is None:
+            return None
+        return self._segment_graph().element_location(_vertex)
 
     def _make_signal_table(self) -> pandas.DataFrame:
-        _df_dict = {col: [] for col in ["position", "signal"]}
-        for element in self.active_elements:
-            if not element.signal:
-                continue
-            for key in _df_dict:
-                _df_dict[key].append(getattr(element, key))
-        return pandas.DataFrame.from_dict(_df_dict)
+        _signalled = self.columns.signal > 0
+        return pandas.DataFrame.from_dict(
+            {
+                "position": self.columns.positions[_signalled].tolist(),
+                "signal": [
+                    SIGNAL_CODES[i] for i in self.columns.signal[_signalled].tolist()
+                ],
+            }
+        )
 
     @property
     def tables(self) -> RlyInfoTables:
-        return RlyInfoTables(signals=self._make_signal_table())
+        return self._memoise(
+            "tables", lambda: RlyInfoTables(signals=self._make_signal_table())
+        )
 
-    def _parse_active_element(self, active_elem: typing.List[str]) -> ActiveElement:
-        active_elem: typing.List[str] = [i.strip() for i in active_elem]
+    def _parse_active_element(self, active_elem: ActiveRecord) -> ActiveElement:
         return ActiveElement(
-            element_id=int(active_elem[1]),
-            position=(int(active_elem[2]), int(active_elem[3])),
-            length=(
-                int(active_elem[4]),
-                int(active_elem[5]) if active_elem[5] != "-1" else None,
-            ),
-            speed_limit=(
-                int(active_elem[6]),
-                int(active_elem[7]) if active_elem[7] != "-1" else None,
-            ),
-            location_name=active_elem[8] or None,
-            active_element_name=active_elem[9] or None,
+            element_id=active_elem.element_id,
+            position=active_elem.position,
+            length=active_elem.length,
+            speed_limit=active_elem.speed_limit,
+            location_name=active_elem.location_name,
+            active_element_name=active_elem.active_element_name,
+            signal=active_elem.signal,
         )
 
-    def _parse_text(self, text_elem: typing.List[str]) -> Text:
-        text_elem = [i.strip() for i in text_elem]
+    def _parse_text(self, text_elem: TextRecord) -> Text:
+        _font = dict(
+            name=text_elem.font_name,
+            size=text_elem.font_size,
+            color=text_elem.font_color,
+            charset=text_elem.font_charset,
+            style=text_elem.font_style,
+        )
         return Text(
-            n_items=int(text_elem[0]),
-            position=(int(text_elem[2]), int(text_elem[3])),
-            text_string=text_elem[4],
-            font=Font(
-                name=text_elem[5],
-                size=int(text_elem[6]),
-                color=int(text_elem[7]),
-                charset=int(text_elem[8]),
-                style=int(text_elem[9]),
-            ),
+            position=text_elem.position,
+            text_string=text_elem.text_string,
+            font=Font(**_font),
         )
 
-    def _parse_inactive_element(
-        self, inactive_elem: typing.List[str]
-    ) -> InactiveElement:
-        if inactive_elem := [i.strip() for i in inactive_elem]:
-            return InactiveElement(
-                element_id=int(inactive_elem[1]),
-                position=(int(inactive_elem[2]), int(inactive_elem[3])),
-                location_name=inactive_elem[4] or None,
+    def _parse_inactive_element(self, inactive_elem: InactiveRecord) -> InactiveElement:
+        return InactiveElement(
+            element_id=inactive_elem.element_id,
+            position=inactive_elem.position,
+            location_name=inactive_elem.location_name,
+        )
+
+    def _parse_metadata(self, columns: RlyColumns) -> Metadata:
+        return Metadata(
+            program_version=columns.program_version,
+            home_position=list(columns.home_position),
+            n_active_elements=columns.n_active_elements,
+            n_inactive_elements=columns.n_inactive_elements,
+        )
+
+    def _get_rly_components(
+        self,
+        columns: RlyColumns,
+        reused: typing.Optional[typing.Dict[int, ActiveElement]] = None,
+    ) -> RlyData:
+        self._logger.debug("Building railway components from columnar data")
+        _reused = reused or {}
+        _components = dict(
+            active_elements=[
+                _reused.get(i) or self._parse_active_element(record)
+                for i, record in enumerate(columns.active_records())
+            ],
+            inactive_elements=[
+                self._parse_inactive_element(i) for i in columns.inactive_records()
+            ],
+            metadata=self._parse_metadata(columns),
+            text=[self._parse_text(i) for i in columns.text] or None,
+        )
+        _rly_data = RlyData(**_components)
+        self._assign_neighbours(_rly_data, columns, _reused)
+        return _rly_data
+
+    @staticmethod
+    def _build_element_index(
+        columns: RlyColumns,
+    ) -> typing.Dict[typing.Tuple[int, int], int]:
+        """Map element coordinates to element types for constant time lookup.
+
+        Active elements take priority over inactive elements sharing the same
+        position, and the first element found at a position is retained.
+        """
+        _index: typing.Dict[typing.Tuple[int, int], int] = dict(
+            zip(
+                map(tuple, columns.inactive_positions[::-1].tolist()),
+                columns.inactive_element_id[::-1].tolist(),
             )
-        else:
-            raise railos_exc.ParsingError("No inactive elements were found.")
-
-    def _parse_metadata(self, metadata: typing.List[str]) -> Metadata:
-        if metadata := [i.strip() for i in metadata]:
-            _prog_version_re = re.findall(r"(v\d+\.\d+\.\d+)", metadata[0])
-            return Metadata(
-                program_version=_prog_version_re[0],
-                home_position=(int(metadata[1]), int(metadata[2])),
-                n_active_elements=int(metadata[3]),
+        )
+        _index.update(
+            zip(
+                map(tuple, columns.positions[::-1].tolist()),
+                columns.element_id[::-1].tolist(),
             )
-        else:
-            raise railos_exc.ParsingError("Failed to retrieve railway metadata.")
-
-    def _get_rly_components(self, railway_file_data: str) -> RlyData:
-        self._logger.debug("Retrieving components from extracted railway file data")
-        _functions = {
-            "metadata": lambda x: self._parse_metadata(x),
-            "inactive_elements": lambda x: self._parse_inactive_element(x),
-            "active_elements": lambda x: self._parse_active_element(x),
-            "text": lambda x: self._parse_text(x),
-        }
-        _signals: typing.Dict[str, typing.Optional[str]] = {
-            "G": "ground",
-            "4": "4AT",
-            "3": "3AT",
-            "2": "2AT",
-            "*": None,
-        }
-        _data_dict: typing.Dict[
-            str, typing.Union[Text, ActiveElement, InactiveElement, Metadata]
-        ] = {}
-        _key = "metadata"
-        _part = []
-        _counter = 0
-        for i, line in enumerate(railway_file_data):
-            _counter += 1
-            if "**Active elements**" in line:
-                _data_dict[_key] = _functions[_key](_part)
-                _key = "active_elements"
-                _data_dict[_key] = []
-                _part = []
-                continue
-            elif "**Inactive elements**" in line:
-                _data_dict["metadata"].n_inactive_elements = int(
-                    railway_file_data[i - 1]
-                )
-                _key = "inactive_elements"
-                _part = []
-                _data_dict[_key] = []
-                continue
-            elif "***" in line and _key != "inactive_elements":
-                try:
-                    _element: ActiveElement = _functions[_key](_part)
-                    _element.signal = _signals[line[0]]
-                    _data_dict[_key].append(_element)
-                except ValueError as e:
-                    if _key != "inactive_elements":
-                        raise e
-                    _key = "text"
-                    _part = []
-                    _data_dict[_key] = []
-                    continue
-                _part = []
+        )
+        return _index
+
+    @staticmethod
+    def _assign_neighbours(
+        rly_data: RlyData,
+        columns: RlyColumns,
+        skip: typing.Container[int] = (),
+    ) -> None:
+        _positions = list(map(tuple, columns.positions.tolist()))
+        _indptr = columns.neighbour_indptr.tolist()
+        _indices = columns.neighbour_indices.tolist()
+        for i, element in enumerate(rly_data.active_elements):
+            if i in skip:
                 continue
-            _part.append(line.strip().replace("\0", ""))
-
-        if _counter != len(railway_file_data):
-            raise RailwayParsingError(
-                f"Expected {len(railway_file_data)} statements from rly file but only {_counter} were recovered."
+            element.neighbours.extend(
+                _positions[j] for j in _indices[_indptr[i] : _indptr[i + 1]]
             )
 
-        return RlyData(**_data_dict)
-
-    def _assign_neighbours(self) -> None:
-        for element in self.active_elements:
-            element.neighbours = self.get_element_connected_neighbours(element.position)
+    def _build_node_map(
+        self, columns: RlyColumns, edges: numpy.ndarray
+    ) -> typing.Tuple[igraph.Graph, typing.Dict[typing.Tuple[int, int], int]]:
+        """Build the railway graph with one vertex per active element.
 
-    def _build_node_map(self) -> igraph.Graph:
-        _node_connections: typing.List[typing.Tuple[int, int]] = []
+        Returns the graph alongside a mapping from element coordinates to
+        the integer identifier of the corresponding vertex.
+        """
         _node_graph = igraph.Graph()
-        for element in tqdm.tqdm(self.active_elements):
-            for coordinate in element.neighbours:
-                _coord_str: typing.Tuple[str, str] = (
-                    element.position_id,
-                    coordinate_to_position_identifier(coordinate),
-                )
-                _rev_coord_str: typing.Tuple[str, str] = tuple(reversed(_coord_str))
-                if (
-                    _coord_str not in _node_connections
-                    and _rev_coord_str not in _node_connections
-                ):
-                    _node_connections.append(_coord_str)
-            _node_graph.add_vertex(
-                element.position_id,
-                x=element.position[0],
-                y=element.position[1],
-                label="",
+        _node_graph.add_vertices(
+            len(columns.x), attributes=self._vertex_attributes(columns.positions)
+        )
+        _node_graph.add_edges(edges.tolist())
+        return _node_graph, self._build_vertex_ids(columns)
+
+    @staticmethod
+    def _build_vertex_ids(
+        columns: RlyColumns,
+    ) -> typing.Dict[typing.Tuple[int, int], int]:
+        _positions = columns.positions.tolist()
+        return dict(
+            zip(
+                map(tuple, reversed(_positions)),
+                range(len(_positions) - 1, -1, -1),
             )
-        _node_graph.add_edges(_node_connections)
-        return _node_graph
+        )
+
+    @staticmethod
+    def _vertex_attributes(
+        positions: numpy.ndarray,
+    ) -> typing.Dict[str, typing.List[typing.Any]]:
+        _positions = positions.tolist()
+        return {
+            "name": [coordinate_to_position_identifier(i) for i in _positions],
+            "x": [i[0] for i in _positions],
+            "y": [i[1] for i in _positions],
+            "label": [""] * len(_positions),
+        }
 
-    def plot(self, target_file: str, map_key: typing.Optional[str] = None) -> None:
-        """Plot the node map for the railway"""
+    def _patch_node_map(
+        self,
+        node_graph: igraph.Graph,
+        columns: RlyColumns,
+        edges: numpy.ndarray,
+        changes: RlyChanges,
+    ) -> None:
+        """Update the railway graph in place for a new railway version.
+
+        Requires that elements either keep their indices, in which case
+        elements replaced at an index reuse its vertex, or keep their order
+        with any additions at the end. Removed elements lose their vertices,
+        added elements gain new ones and only the edges of affected elements
+        are replaced.
+        """
+        _n_elements: int = len(columns.element_id)
+        _replaced = numpy.zeros(0, dtype=numpy.int64)
+        _deleted = changes.removed
+        if changes.keeps_indices:
+            _replaced = changes.removed[changes.removed < _n_elements]
+            _deleted = changes.removed[changes.removed >= _n_elements]
+        _appended = numpy.setdiff1d(changes.added, _replaced)
+
+        node_graph.delete_vertices(_deleted.tolist())
+        for name, values in self._vertex_attributes(
+            columns.positions[_replaced]
+        ).items():
+            node_graph.vs[_replaced.tolist()][name] = values
+        node_graph.add_vertices(
+            len(_appended),
+            attributes=self._vertex_attributes(columns.positions[_appended]),
+        )
+        node_graph.delete_edges(
+            node_graph.es.select(_incident=changes.affected.tolist())
+        )
+        node_graph.add_edges(
+            edges[numpy.isin(edges, changes.affected).any(axis=1)].tolist()
+        )
+
+    def plot(
+        self,
+        target_file: str,
+        map_key: typing.Optional[str] = None,
+        coordinates: bool = False,
+        signals: bool = True,
+        labels: bool = True,
+    ) -> None:
+        """Plot the node map for the railway
+
+        Parameters
+        ----------
+        target_file: str
+            file to save the figure to
+        map_key: str, optional
+            railway to plot, by default the one most recently parsed
+        coordinates: bool, optional
+            if True, draw the railway from the element grid positions rather
+            than laying out the node map
+        signals: bool, optional
+            whether to mark signals when drawing from coordinates
+        labels: bool, optional
+            whether to label timetable locations when drawing from coordinates
+        """
         if not self._node_map:
             raise RailwayParsingError("No file parsed yet.")
 
+        _figure, _axis = plt.subplots()
+
+        if coordinates:
+            draw_railway(
+                self._columns[map_key or self._current_key],
+                _axis,
+                signals=signals,
+                labels=labels,
+            )
+            _figure.savefig(target_file, dpi=300)
+            plt.close(_figure)
+            return
+
         if not map_key:
             _map = self.nodes
         else:
             _map = self._node_map[map_key]
 
-        _figure, _axis = plt.subplots()
         igraph.plot(_map, layout=_map.layout("auto"), target=_axis)
         _figure.savefig(target_file)
 
@@ -533,10 +1316,10 @@ class RlyParser:
 
         if isinstance(output_file, str):
             with open(output_file, "w") as out_f:
-                json.dump(self._rly_data, out_f, indent=2)
+                json.dump(self.data, out_f, indent=2)
         else:
             _out_str = json.dumps(
-                {k: v.model_dump_json() for k, v in self._rly_data.items()}, indent=2
+                {k: v.model_dump_json() for k, v in self.data.items()}, indent=2
             )
             output_file.write(_out_str)
 
@@ -0,0 +1,149 @@
+import typing
+
+import matplotlib.axes
+import matplotlib.collections
+import numpy
+
+from railostools.common.enumeration import Elements
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.relations import POINTS, PORT_OFFSETS, PORT_TABLE, SIGNALS
+
+# Element classes drawn as a single line collection each, with their colour
+ELEMENT_CLASSES: typing.Dict[str, str] = {
+    "track": "black",
+    "points": "tab:blue",
+    "crossings": "tab:purple",
+    "signals": "tab:red",
+    "level_crossings": "tab:orange",
+}
+
+_CROSSINGS: typing.Tuple[Elements, ...] = tuple(
+    e
+    for e in Elements
+    if e.name.startswith(("Crossing_", "Bridge_", "Underpass_")) or "_Over_" in e.name
+)
+
+
+def _build_class_table() -> numpy.ndarray:
+    _classes = list(ELEMENT_CLASSES)
+    _table = numpy.zeros(PORT_TABLE.shape[0], dtype=numpy.int8)
+    for name, elements in (
+        ("points", POINTS),
+        ("crossings", _CROSSINGS),
+        ("signals", SIGNALS),
+        ("level_crossings", (Elements.Level_Crossing,)),
+    ):
+        _table[[int(e) for e in elements]] = _classes.index(name)
+    return _table
+
+
+# Index into ELEMENT_CLASSES for each element type
+_CLASS_TABLE: numpy.ndarray = _build_class_table()
+
+# Level crossings have no connection ports so are drawn as a cross of two
+# diagonals, given as the offsets of their ends from the cell centre
+_CROSS_OFFSETS: numpy.ndarray = 0.3 * numpy.array(
+    [[[-1, -1], [1, 1]], [[-1, 1], [1, -1]]]
+)
+
+
+def element_segments(columns: RlyColumns) -> typing.Dict[str, numpy.ndarray]:
+    """Build the line segments making up each class of active element.
+
+    Every element is drawn as a segment from its cell centre to the edge of
+    the cell for each of its connection ports, with level crossings drawn as
+    a cross over their cell.
+
+    Returns
+    -------
+    Dict[str, numpy.ndarray]
+        (N, 2, 2) arrays of segment end points for each element class
+    """
+    _starts: typing.List[numpy.ndarray] = []
+    _ends: typing.List[numpy.ndarray] = []
+    _classes: typing.List[numpy.ndarray] = []
+    _positions = columns.positions.astype(float)
+
+    for port, offset in PORT_OFFSETS.items():
+        _has_port = PORT_TABLE[columns.element_id, port]
+        _starts.append(_positions[_has_port])
+        _ends.append(_positions[_has_port] + 0.5 * numpy.array(offset))
+        _classes.append(_CLASS_TABLE[columns.element_id[_has_port]])
+
+    _segments = numpy.stack(
+        (numpy.concatenate(_starts), numpy.concatenate(_ends)), axis=1
+    )
+    _crossings = _positions[columns.element_id == Elements.Level_Crossing]
+    _segments = numpy.concatenate(
+        (_segments, (_crossings[:, None, None] + _CROSS_OFFSETS).reshape(-1, 2, 2))
+    )
+    _classes.append(
+        numpy.full(
+            2 * len(_crossings),
+            list(ELEMENT_CLASSES).index("level_crossings"),
+            dtype=numpy.int8,
+        )
+    )
+    _segment_classes = numpy.concatenate(_classes)
+
+    return {
+        name: _segments[_segment_classes == i] for i, name in enumerate(ELEMENT_CLASSES)
+    }
+
+
+def draw_railway(
+    columns: RlyColumns,
+    axis: matplotlib.axes.Axes,
+    signals: bool = True,
+    labels: bool = True,
+) -> None:
+    """Draw a railway onto a set of axes from its element coordinates.
+
+    Parameters
+    ----------
+    columns: RlyColumns
+        columnar representation of the railway
+    axis: matplotlib.axes.Axes
+        axes on which to draw
+    signals: bool, optional
+        whether to mark signals
+    labels: bool, optional
+        whether to label timetable locations
+    """
+    for name, segments in element_segments(columns).items():
+        if len(segments):
+            axis.add_collection(
+                matplotlib.collections.LineCollection(
+                    segments,
+                    colors=ELEMENT_CLASSES[name],
+                    linewidths=0.8,
+                    label=name.replace("_", " "),
+                )
+            )
+
+    if signals and (_signalled := columns.signal != 0).any():
+        axis.scatter(
+            columns.x[_signalled],
+            columns.y[_signalled],
+            s=1,
+            c=ELEMENT_CLASSES["signals"],
+            zorder=3,
+        )
+
+    if labels:
+        for location, indices in columns.group_by_name().items():
+            if location == "-1":
+                continue
+            axis.annotate(
+                location,
+                (columns.x[indices].mean(), columns.y[indices].min() - 1),
+                fontsize=4,
+                ha="center",
+            )
+
+    axis.autoscale_view()
+    axis.set_aspect("equal")
+
+    # RailOS coordinates increase downwards
+    axis.invert_yaxis()
+    axis.set_axis_off()
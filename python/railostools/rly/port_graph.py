@@ -0,0 +1,268 @@
+import dataclasses
+import typing
+
+import igraph
+import numpy
+
+from railostools.common.enumeration import Elements
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.relations import CONNECTIONS, MIRRORED_PORTS, PORT_OFFSETS
+
+# The centre port 5 is used as the entry port of single connection elements
+# such as exits and buffers, representing a train starting from the element
+# rather than arriving at it.
+CENTRE_PORT: int = 5
+
+# Port pairs forming the named straight tracks within crossings and bridges
+_STRAIGHT_TRACKS: typing.Dict[str, typing.Tuple[int, int]] = {
+    "Horizontal": (4, 6),
+    "Vertical": (2, 8),
+    "DiagonalUp": (3, 7),
+    "DiagonalDown": (1, 9),
+}
+
+# Trunk port of right angle junctions, which cannot be found from the port
+# angles alone, keyed by the direction following "Junction_" in the name
+_RIGHT_ANGLE_TRUNKS: typing.Dict[str, int] = {
+    "Right": 4,
+    "Left": 6,
+    "Up": 8,
+    "Down": 2,
+}
+
+
+def _angle_cosine(port_one: int, port_two: int) -> float:
+    _one = numpy.array(PORT_OFFSETS[port_one], dtype=float)
+    _two = numpy.array(PORT_OFFSETS[port_two], dtype=float)
+    return float(_one @ _two / (numpy.linalg.norm(_one) * numpy.linalg.norm(_two)))
+
+
+def _junction_trunk(element: Elements, ports: typing.Tuple[int, ...]) -> int:
+    """Find the port from which both legs of a junction can be reached"""
+    if element.name.endswith("RightAngle"):
+        return _RIGHT_ANGLE_TRUNKS[element.name.split("_")[1]]
+
+    # The trunk meets both legs at an angle of at least 135 degrees
+    for port in ports:
+        if all(_angle_cosine(port, other) < -0.7 for other in ports if other != port):
+            return port
+
+    raise ValueError(f"Cannot identify trunk of junction '{element.name}'")
+
+
+def element_routes(
+    element: Elements, ports: typing.Tuple[int, ...]
+) -> typing.List[typing.Tuple[int, int, int]]:
+    """List the legal traversals of an element.
+
+    Parameters
+    ----------
+    element: Elements
+        the element type
+    ports: Tuple[int, ...]
+        connection ports of the element
+
+    Returns
+    -------
+    List[Tuple[int, int, int]]
+        entry port, exit port and track index for each legal traversal, the
+        track index selecting between the two lengths and speed limits
+    """
+    if not ports:
+        return []
+
+    if len(ports) == 1:
+        return [(CENTRE_PORT, ports[0], 0)]
+
+    if len(ports) == 2:
+        return [(ports[0], ports[1], 0), (ports[1], ports[0], 0)]
+
+    if len(ports) == 4:
+        _first_track = next(
+            _STRAIGHT_TRACKS[word]
+            for word in element.name.split("_")
+            if word in _STRAIGHT_TRACKS
+        )
+        return [(p, 10 - p, int(p not in _first_track)) for p in ports]
+
+    _trunk = _junction_trunk(element, ports)
+    _legs = sorted(
+        (p for p in ports if p != _trunk), key=lambda p: (p != 10 - _trunk, p)
+    )
+    _routes: typing.List[typing.Tuple[int, int, int]] = []
+    for track, leg in enumerate(_legs):
+        _routes += [(_trunk, leg, track), (leg, _trunk, track)]
+    return _routes
+
+
+def _build_route_table() -> numpy.ndarray:
+    """Tabulate the track used by each legal traversal of each element type.
+
+    The table is indexed as ``[element_type, entry_port, exit_port]`` holding
+    the track index used, or -1 where the traversal is not allowed.
+    """
+    _table = numpy.full((max(Elements) + 1, 10, 10), -1, dtype=numpy.int8)
+
+    for element, ports in CONNECTIONS.items():
+        for entry_port, exit_port, track in element_routes(element, ports or ()):
+            _table[element, entry_port, exit_port] = track
+
+    return _table
+
+
+ROUTE_TABLE: numpy.ndarray = _build_route_table()
+
+# Track index used by trains passing through each port of each element type,
+# the first track being used where a port is shared by both, or -1 for none
+PORT_TRACKS: numpy.ndarray = numpy.where(
+    (ROUTE_TABLE >= 0).any(axis=1),
+    numpy.where(ROUTE_TABLE >= 0, ROUTE_TABLE, 1).min(axis=1),
+    -1,
+)
+
+
+def port_track_values(
+    columns: RlyColumns, values: numpy.ndarray, fill: int = 0
+) -> numpy.ndarray:
+    """Tabulate a track attribute for the track used through each port.
+
+    Parameters
+    ----------
+    columns: RlyColumns
+        columnar representation of the railway
+    values: numpy.ndarray
+        (N, 2) array of the attribute for each track of each element, such
+        as ``columns.length``
+    fill: int, optional
+        value for ports not used by any track
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 10) array indexed by element and port
+    """
+    _tracks = PORT_TRACKS[columns.element_id]
+    _used = _tracks >= 0
+    _table = numpy.full(_tracks.shape, fill, dtype=values.dtype)
+    _table[_used] = values[numpy.nonzero(_used)[0], _tracks[_used]]
+    return _table
+
+
+# Ports for which each element type has a vertex in the port graph
+_VERTEX_PORTS: numpy.ndarray = (ROUTE_TABLE >= 0).any(axis=2) | (ROUTE_TABLE >= 0).any(
+    axis=1
+)
+
+
+@dataclasses.dataclass
+class PortGraph:
+    """Directed graph of legal train movements.
+
+    There is one vertex per active element and entry port, a train at vertex
+    ``(i, p)`` having entered element ``i`` through port ``p``. Each edge is a
+    legal traversal of an element into its connected neighbour, weighted by
+    the length and speed limit of the track used in the element being left,
+    or a zero length jump from a continuation to its linked partner.
+    Edges are held in compressed sparse row layout, the edges leaving vertex
+    ``v`` being ``indptr[v]:indptr[v + 1]``.
+    """
+
+    element: numpy.ndarray
+    port: numpy.ndarray
+    indptr: numpy.ndarray
+    indices: numpy.ndarray
+    lengths: numpy.ndarray
+    speed_limits: numpy.ndarray
+
+    @classmethod
+    def from_columns(cls, columns: RlyColumns) -> "PortGraph":
+        """Build the port graph of a railway"""
+        _n_elements: int = len(columns.element_id)
+        _has_vertex = _VERTEX_PORTS[columns.element_id]
+        _element, _port = numpy.nonzero(_has_vertex)
+        _vertex_of = numpy.full((_n_elements, 10), -1, dtype=numpy.int64)
+        _vertex_of[_element, _port] = numpy.arange(len(_element))
+
+        _neighbour_ports = columns.neighbour_ports()
+        _route_tracks = ROUTE_TABLE[columns.element_id[_element], _port]
+
+        _sources: typing.List[numpy.ndarray] = []
+        _targets: typing.List[numpy.ndarray] = []
+        _tracks: typing.List[numpy.ndarray] = []
+
+        for exit_port, entry_port in MIRRORED_PORTS.items():
+            _next = _neighbour_ports[_element, exit_port]
+            _legal = numpy.flatnonzero(
+                (_route_tracks[:, exit_port] >= 0) & (_next >= 0)
+            )
+            _sources.append(_legal)
+            _targets.append(_vertex_of[_next[_legal], entry_port])
+            _tracks.append(_route_tracks[_legal, exit_port])
+
+        # A train arriving at a continuation carries on from its linked
+        # partner, recorded with a track index of -1 as no distance is covered
+        if columns.link is not None:
+            _partner = columns.link[_element]
+            _linked = numpy.flatnonzero((_partner >= 0) & (_port != CENTRE_PORT))
+            _sources.append(_linked)
+            _targets.append(_vertex_of[_partner[_linked], CENTRE_PORT])
+            _tracks.append(numpy.full(len(_linked), -1))
+
+        _all_sources = numpy.concatenate(_sources)
+        _order = numpy.argsort(_all_sources, kind="stable")
+        _left = _element[_all_sources[_order]]
+        _track = numpy.concatenate(_tracks)[_order].astype(numpy.intp)
+        _jump = _track < 0
+        _track[_jump] = 0
+
+        _indptr = numpy.zeros(len(_element) + 1, dtype=numpy.int64)
+        numpy.cumsum(
+            numpy.bincount(_all_sources, minlength=len(_element)), out=_indptr[1:]
+        )
+
+        return cls(
+            element=_element,
+            port=_port,
+            indptr=_indptr,
+            indices=numpy.concatenate(_targets)[_order],
+            lengths=numpy.where(_jump, 0, columns.length[_left, _track]),
+            speed_limits=columns.speed_limit[_left, _track],
+        )
+
+    @property
+    def n_vertices(self) -> int:
+        return len(self.element)
+
+    def vertices(
+        self, element_indices: typing.Union[int, typing.Iterable[int]]
+    ) -> numpy.ndarray:
+        """Return the vertices belonging to one or more elements"""
+        return numpy.flatnonzero(
+            numpy.isin(self.element, numpy.asarray(element_indices))
+        )
+
+    def to_igraph(self, columns: RlyColumns) -> igraph.Graph:
+        """Convert to a directed igraph graph.
+
+        Vertices carry the element index, entry port and element position,
+        edges the length and speed limit of the traversal.
+        """
+        _graph = igraph.Graph(directed=True)
+        _graph.add_vertices(
+            self.n_vertices,
+            attributes={
+                "element": self.element.tolist(),
+                "port": self.port.tolist(),
+                "x": columns.x[self.element].tolist(),
+                "y": columns.y[self.element].tolist(),
+            },
+        )
+        _sources = numpy.repeat(numpy.arange(self.n_vertices), numpy.diff(self.indptr))
+        _graph.add_edges(
+            numpy.column_stack((_sources, self.indices)).tolist(),
+            attributes={
+                "length": self.lengths.tolist(),
+                "speed_limit": self.speed_limits.tolist(),
+            },
+        )
+        return _graph
@@ -1,6 +1,39 @@
 import typing
+import numpy
+import numpy.typing
 import railostools.common.enumeration as railos_enums
 
+# Based on the file specfications definition for an elements connection points
+#      1 ----- 2 ----- 3
+#      |               |
+#      4               6
+#      |               |
+#      7------ 8 ----- 9
+#
+# with the vertical coordinate increasing downwards as in the RailOS display.
+
+PORT_OFFSETS: typing.Dict[int, typing.Tuple[int, int]] = {
+    1: (-1, -1),
+    2: (0, -1),
+    3: (1, -1),
+    4: (-1, 0),
+    6: (1, 0),
+    7: (-1, 1),
+    8: (0, 1),
+    9: (1, 1),
+}
+
+MIRRORED_PORTS: typing.Dict[int, int] = {
+    1: 9,
+    2: 8,
+    3: 7,
+    4: 6,
+    6: 4,
+    7: 3,
+    8: 2,
+    9: 1,
+}
+
 CONNECTIONS: typing.Dict[
     railos_enums.Elements, typing.Optional[typing.Tuple[int, ...]]
 ] = {
@@ -26,7 +59,7 @@ CONNECTIONS: typing.Dict[
     railos_enums.Elements.Right_DiagonalDown: (4, 9),
     railos_enums.Elements.DiagonalDown_Right: (1, 6),
     railos_enums.Elements.Right_DiagonalUp: (3, 4),
-    railos_enums.Elements.Up_DiagonalUp: (6, 8),
+    railos_enums.Elements.Up_DiagonalUp: (3, 8),
     railos_enums.Elements.Up_DiagonalRight: (1, 8),
     railos_enums.Elements.Down_DiagonalRight: (2, 9),
     railos_enums.Elements.Down_DiagonalLeft: (2, 7),
@@ -39,7 +72,7 @@ CONNECTIONS: typing.Dict[
     railos_enums.Elements.Junction_Down_Left_45Angle: (2, 7, 8),
     railos_enums.Elements.Junction_Down_Right_45Angle: (2, 8, 9),
     railos_enums.Elements.Junction_DiagonalDown_Up_45Angle: (1, 2, 9),
-    railos_enums.Elements.Junction_DiagonalUp_Up_45Angle: (2, 3, 8),
+    railos_enums.Elements.Junction_DiagonalUp_Up_45Angle: (2, 3, 7),
     railos_enums.Elements.Junction_DiagonalUp_Down_45Angle: (3, 7, 8),
     railos_enums.Elements.Junction_DiagonalDown_Down_45Angle: (1, 8, 9),
     railos_enums.Elements.Junction_DiagonalDown_Left_45Angle: (1, 4, 9),
@@ -155,6 +188,46 @@ CONNECTIONS: typing.Dict[
 }
 
 
+def _build_port_table() -> numpy.ndarray:
+    """Tabulate the connection points used by each element type.
+
+    The table is indexed as ``[element_type, port]`` with ports numbered
+    1-9 as above, the unused index 5 always being unset.
+    """
+    _table = numpy.zeros((max(railos_enums.Elements) + 1, 10), dtype=bool)
+
+    for element_type, ports in CONNECTIONS.items():
+        _table[element_type, list(ports or ())] = True
+
+    return _table
+
+
+PORT_TABLE: numpy.ndarray = _build_port_table()
+
+
+def _build_connectivity_table() -> numpy.ndarray:
+    """Tabulate whether element types connect for each relative placement.
+
+    The table is indexed as ``[type_one, type_two, dx + 1, dy + 1]`` where
+    ``(dx, dy)`` is the position of element two relative to element one.
+    """
+    _n_types: int = PORT_TABLE.shape[0]
+    _table = numpy.zeros((_n_types, _n_types, 3, 3), dtype=bool)
+
+    for port, (dx, dy) in PORT_OFFSETS.items():
+        _table[:, :, dx + 1, dy + 1] = numpy.outer(
+            PORT_TABLE[:, port], PORT_TABLE[:, MIRRORED_PORTS[port]]
+        )
+
+    return _table
+
+
+CONNECTIVITY_TABLE: numpy.ndarray = _build_connectivity_table()
+
+# Whether two element types connect in any relative placement
+_TYPE_CONNECTIVITY: numpy.ndarray = CONNECTIVITY_TABLE.any(axis=(2, 3))
+
+
 def can_connect(
     element_one_type: railos_enums.Elements,
     element_two_type: railos_enums.Elements,
@@ -164,7 +237,7 @@ def can_connect(
     """Return whether two element types form a connection.
 
     If coordinates are provided a comparison is also made to
-    check that the two elements are adjacent.
+    check that the two elements are adjacent with facing connection points.
 
     Parameters
     ----------
@@ -177,56 +250,113 @@ def can_connect(
     coord_2: Tuple[int, int], optional
         the coordinates of element two
     """
+    if not all([coord_1, coord_2]):
+        return bool(_TYPE_CONNECTIVITY[element_one_type, element_two_type])
+
+    _dx: int = coord_2[0] - coord_1[0]
+    _dy: int = coord_2[1] - coord_1[1]
 
-    # Based on the file specfications definition for an elements connection points
-    #      1 ----- 2 ----- 3
-    #      |               |
-    #      4               6
-    #      |               |
-    #      7------ 8 ----- 9
-    #
-
-    _neighbour_mapping: typing.Dict[int, int] = {
-        1: 9,
-        2: 8,
-        3: 7,
-        4: 6,
-        6: 4,
-        7: 3,
-        8: 2,
-        9: 1,
-    }
-
-    # Find the join points of the first element
-    _permitted_join_positions: typing.List[int] = [
-        _neighbour_mapping[i] for i in CONNECTIONS[element_one_type]
-    ]
-
-    # Find the join point of the first element that connects to the second
-    _connections: typing.List[int] = [
-        i for i in _permitted_join_positions if i in CONNECTIONS[element_two_type]
-    ]
-
-    if not _connections:
+    if abs(_dx) > 1 or abs(_dy) > 1:
         return False
-    elif not all([coord_1, coord_2]):
-        return True
-
-    _connects: bool = False
-
-    # There are multiple ways of positioning the two elements so check all
-    for connection in _connections:
-        if connection in {4, 6}:
-            _connects |= (
-                abs(coord_1[0] - coord_2[0]) == 1 and coord_1[1] - coord_2[1] == 0
-            )
-        elif connection in {2, 8}:
-            _connects |= (
-                abs(coord_1[1] - coord_2[1]) == 1 and coord_1[0] - coord_2[0] == 0
-            )
-        elif connection in {1, 9, 3, 7}:
-            _connects |= (
-                abs(coord_1[1] - coord_2[1]) == 1 and abs(coord_1[0] - coord_2[0]) == 1
-            )
-
-    return _connects
+
+    return bool(
+        CONNECTIVITY_TABLE[element_one_type, element_two_type, _dx + 1, _dy + 1]
+    )
+
+
+def can_connect_many(
+    element_one_types: numpy.typing.ArrayLike,
+    element_two_types: numpy.typing.ArrayLike,
+    coords_1: typing.Optional[numpy.typing.ArrayLike] = None,
+    coords_2: typing.Optional[numpy.typing.ArrayLike] = None,
+) -> numpy.ndarray:
+    """Return whether each pair of element types forms a connection.
+
+    Vectorised form of ``can_connect`` operating on whole arrays of
+    element pairs at once.
+
+    Parameters
+    ----------
+    element_one_types: ArrayLike
+        integer element types of the first element of each pair
+    element_two_types: ArrayLike
+        integer element types of the second element of each pair
+    coords_1: ArrayLike, optional
+        coordinates of the first elements as an (N, 2) array
+    coords_2: ArrayLike, optional
+        coordinates of the second elements as an (N, 2) array
+
+    Returns
+    -------
+    numpy.ndarray
+        boolean array with one entry per element pair
+    """
+    _types_1 = numpy.asarray(element_one_types, dtype=numpy.intp)
+    _types_2 = numpy.asarray(element_two_types, dtype=numpy.intp)
+
+    if coords_1 is None or coords_2 is None:
+        return _TYPE_CONNECTIVITY[_types_1, _types_2]
+
+    _delta = numpy.asarray(coords_2, dtype=numpy.intp) - numpy.asarray(
+        coords_1, dtype=numpy.intp
+    )
+    _adjacent = numpy.all(numpy.abs(_delta) <= 1, axis=-1)
+    _delta = numpy.where(_adjacent[..., None], _delta, 0) + 1
+
+    return (
+        _adjacent
+        & CONNECTIVITY_TABLE[_types_1, _types_2, _delta[..., 0], _delta[..., 1]]
+    )
+
+
+# Element types counted as points (switches)
+POINTS: typing.Tuple[railos_enums.Elements, ...] = (
+    railos_enums.Elements.Junction_Right_Up_RightAngle,
+    railos_enums.Elements.Junction_Left_Up_RightAngle,
+    railos_enums.Elements.Junction_Right_Down_RightAngle,
+    railos_enums.Elements.Junction_Left_Down_RightAngle,
+    railos_enums.Elements.Junction_Up_Left_RightAngle,
+    railos_enums.Elements.Junction_Up_Right_RightAngle,
+    railos_enums.Elements.Junction_Down_Left_RightAngle,
+    railos_enums.Elements.Junction_Down_Right_RightAngle,
+    railos_enums.Elements.Junction_Right_Up_45Angle,
+    railos_enums.Elements.Junction_Left_Up_45Angle,
+    railos_enums.Elements.Junction_Right_Down_45Angle,
+    railos_enums.Elements.Junction_Left_Down_45Angle,
+    railos_enums.Elements.Junction_Up_Left_45Angle,
+    railos_enums.Elements.Junction_Up_Right_45Angle,
+    railos_enums.Elements.Junction_Down_Left_45Angle,
+    railos_enums.Elements.Junction_Down_Right_45Angle,
+    railos_enums.Elements.Junction_DiagonalDown_Up_45Angle,
+    railos_enums.Elements.Junction_DiagonalUp_Up_45Angle,
+    railos_enums.Elements.Junction_DiagonalUp_Down_45Angle,
+    railos_enums.Elements.Junction_DiagonalDown_Down_45Angle,
+    railos_enums.Elements.Junction_DiagonalDown_Left_45Angle,
+    railos_enums.Elements.Junction_DiagonalUp_Right_45Angle,
+    railos_enums.Elements.Junction_DiagonalUp_Left_45Angle,
+    railos_enums.Elements.Junction_DiagonalDown_Right_45Angle,
+)
+
+# Element types which are signals
+SIGNALS: typing.Tuple[railos_enums.Elements, ...] = (
+    railos_enums.Elements.Signal_Right,
+    railos_enums.Elements.Signal_Left,
+    railos_enums.Elements.Signal_Up,
+    railos_enums.Elements.Signal_Down,
+    railos_enums.Elements.Signal_Up_Left,
+    railos_enums.Elements.Signal_Up_Right,
+    railos_enums.Elements.Signal_Down_Left,
+    railos_enums.Elements.Signal_Down_Right,
+)
+
+# Element types at which trains enter and leave the railway
+EXITS: typing.Tuple[railos_enums.Elements, ...] = (
+    railos_enums.Elements.Exit_Left,
+    railos_enums.Elements.Exit_Right,
+    railos_enums.Elements.Exit_Down,
+    railos_enums.Elements.Exit_Up,
+    railos_enums.Elements.Exit_Up_Left,
+    railos_enums.Elements.Exit_Up_Right,
+    railos_enums.Elements.Exit_Down_Left,
+    railos_enums.Elements.Exit_Down_Right,
+)
@@ -0,0 +1,285 @@
+import dataclasses
+import heapq
+import math
+import typing
+
+import numpy
+
+from railostools.rly.port_graph import PortGraph
+
+# Conversion from speed limits in km/h to metres per second
+KMH_TO_MS: float = 1 / 3.6
+
+
+@dataclasses.dataclass
+class Route:
+    path: typing.List[typing.Tuple[int, int]]
+    distance: int
+    time: float
+
+
+@dataclasses.dataclass
+class SearchTree:
+    """Shortest running times from a set of origin vertices to all others.
+
+    Unreached vertices have an infinite time and a predecessor of -1.
+    """
+
+    time: numpy.ndarray
+    distance: numpy.ndarray
+    predecessor: numpy.ndarray
+
+    def path(self, vertex: int) -> typing.List[int]:
+        """Return the vertices from the origin to the given vertex"""
+        _path: typing.List[int] = [vertex]
+        while (vertex := int(self.predecessor[vertex])) >= 0:
+            _path.append(vertex)
+        return _path[::-1]
+
+
+def running_times(graph: PortGraph) -> numpy.ndarray:
+    """Minimum running time in seconds along each edge of the port graph"""
+    return graph.lengths / (graph.speed_limits * KMH_TO_MS)
+
+
+def search(
+    graph: PortGraph,
+    sources: typing.Iterable[int],
+    times: typing.Optional[numpy.ndarray] = None,
+) -> SearchTree:
+    """Find the quickest movement from a set of vertices to every other.
+
+    Parameters
+    ----------
+    graph: PortGraph
+        the graph to search
+    sources: Iterable[int]
+        vertices from which a train may start
+    times: numpy.ndarray, optional
+        running time along each edge, by default computed from the edge
+        lengths and speed limits
+
+    Returns
+    -------
+    SearchTree
+        running times, distances and predecessors of all vertices
+    """
+    _indptr: typing.List[int] = graph.indptr.tolist()
+    _indices: typing.List[int] = graph.indices.tolist()
+    _times: typing.List[float] = (
+        running_times(graph) if times is None else times
+    ).tolist()
+    _lengths: typing.List[int] = graph.lengths.tolist()
+
+    _best: typing.List[float] = [math.inf] * graph.n_vertices
+    _distance: typing.List[int] = [0] * graph.n_vertices
+    _predecessor: typing.List[int] = [-1] * graph.n_vertices
+    _queue: typing.List[typing.Tuple[float, int]] = []
+
+    for source in sources:
+        _best[source] = 0.0
+        _queue.append((0.0, source))
+    heapq.heapify(_queue)
+
+    while _queue:
+        _time, _vertex = heapq.heappop(_queue)
+        if _time > _best[_vertex]:
+            continue
+        for edge in range(_indptr[_vertex], _indptr[_vertex + 1]):
+            _next = _indices[edge]
+            if (_next_time := _time + _times[edge]) < _best[_next]:
+                _best[_next] = _next_time
+                _distance[_next] = _distance[_vertex] + _lengths[edge]
+                _predecessor[_next] = _vertex
+                heapq.heappush(_queue, (_next_time, _next))
+
+    return SearchTree(
+        time=numpy.array(_best),
+        distance=numpy.array(_distance),
+        predecessor=numpy.array(_predecessor),
+    )
+
+
+class _Adjacency(typing.NamedTuple):
+    """Graph edges in compressed sparse row layout as Python lists"""
+
+    indptr: typing.List[int]
+    indices: typing.List[int]
+    weights: typing.List[float]
+
+    def cost(self, source: int, target: int) -> float:
+        _start, _end = self.indptr[source], self.indptr[source + 1]
+        return self.weights[_start + self.indices[_start:_end].index(target)]
+
+
+# A path with its cost and the index at which it deviated from its parent
+_Path = typing.Tuple[float, typing.List[int], int]
+
+
+def _quickest_path(
+    adjacency: _Adjacency,
+    sources: typing.Iterable[int],
+    targets: typing.Set[int],
+    banned_vertices: typing.Set[int],
+    banned_edges: typing.Set[typing.Tuple[int, int]],
+    max_cost: float,
+) -> typing.Optional[typing.Tuple[float, typing.List[int]]]:
+    """Find the cheapest path from any source to the nearest target.
+
+    The search stops on reaching the first target or once all paths cost
+    more than ``max_cost``.
+    """
+    _best: typing.Dict[int, float] = {}
+    _predecessor: typing.Dict[int, int] = {}
+    _queue: typing.List[typing.Tuple[float, int]] = []
+
+    for source in sources:
+        if source not in banned_vertices:
+            _best[source] = 0.0
+            _queue.append((0.0, source))
+    heapq.heapify(_queue)
+
+    while _queue:
+        _cost, _vertex = heapq.heappop(_queue)
+        if _cost > _best[_vertex]:
+            continue
+        if _vertex in targets:
+            _path = [_vertex]
+            while _path[-1] in _predecessor:
+                _path.append(_predecessor[_path[-1]])
+            return _cost, _path[::-1]
+        for edge in range(adjacency.indptr[_vertex], adjacency.indptr[_vertex + 1]):
+            _next = adjacency.indices[edge]
+            _next_cost = _cost + adjacency.weights[edge]
+            if (
+                _next_cost > max_cost
+                or _next in banned_vertices
+                or (_vertex, _next) in banned_edges
+                or _next_cost >= _best.get(_next, math.inf)
+            ):
+                continue
+            _best[_next] = _next_cost
+            _predecessor[_next] = _vertex
+            heapq.heappush(_queue, (_next_cost, _next))
+
+    return None
+
+
+def _deviations(
+    adjacency: _Adjacency,
+    sources: typing.List[int],
+    targets: typing.Set[int],
+    accepted: typing.List[_Path],
+    max_cost: float,
+) -> typing.Iterator[_Path]:
+    """Yield the cheapest paths leaving the last accepted path at each vertex.
+
+    Only deviations at or after the point at which the last path itself
+    deviated are searched, earlier ones having already been found.
+    """
+    _, _previous, _deviation = accepted[-1]
+    _root_cost: float = 0.0
+
+    for i in range(-1, len(_previous) - 1):
+        if i > 0:
+            _root_cost += adjacency.cost(_previous[i - 1], _previous[i])
+        if i < _deviation:
+            continue
+
+        _root = _previous[: i + 1]
+        if i < 0:
+            # Deviate by starting from a different source
+            _used = {p[0] for _, p, _ in accepted}
+            _spur_sources = [s for s in sources if s not in _used]
+        else:
+            _spur_sources = [_previous[i]]
+        _banned_edges = {
+            (p[i], p[i + 1])
+            for _, p, _ in accepted
+            if i >= 0 and len(p) > i + 1 and p[: i + 1] == _root
+        }
+
+        if _spur := _quickest_path(
+            adjacency,
+            _spur_sources,
+            targets,
+            set(_root[:-1]),
+            _banned_edges,
+            max_cost - _root_cost,
+        ):
+            yield _root_cost + _spur[0], _root[:-1] + _spur[1], i
+
+
+def k_shortest_paths(
+    graph: PortGraph,
+    sources: typing.Iterable[int],
+    targets: typing.Iterable[int],
+    k: int,
+    weights: numpy.ndarray,
+    max_cost: float = math.inf,
+    key: typing.Optional[typing.Callable[[typing.List[int]], typing.Hashable]] = None,
+) -> typing.List[typing.Tuple[float, typing.List[int]]]:
+    """Find the k cheapest loopless paths between two sets of vertices.
+
+    Uses Yen's algorithm with Lawler's refinement, each new path only being
+    searched for deviations after the point at which its predecessor
+    deviated, as earlier deviations have already been explored.
+
+    Paths sharing a key are only returned once, as the cheapest of them,
+    though all are still searched for deviations.
+
+    Parameters
+    ----------
+    graph: PortGraph
+        the graph to search
+    sources: Iterable[int]
+        vertices from which a path may start
+    targets: Iterable[int]
+        vertices at which a path may finish
+    k: int
+        maximum number of paths to find
+    weights: numpy.ndarray
+        cost of each edge
+    max_cost: float, optional
+        paths costing more than this are not considered
+    key: Callable[[List[int]], Hashable], optional
+        identifies paths considered the same, by default the vertices
+
+    Returns
+    -------
+    List[Tuple[float, List[int]]]
+        cost and vertices of each path, cheapest first
+    """
+    if k <= 0:
+        return []
+
+    _key = key or tuple
+    _adjacency = _Adjacency(
+        graph.indptr.tolist(), graph.indices.tolist(), weights.tolist()
+    )
+    _sources: typing.List[int] = list(sources)
+    _targets: typing.Set[int] = set(targets)
+
+    _first = _quickest_path(_adjacency, _sources, _targets, set(), set(), max_cost)
+    if not _first:
+        return []
+
+    _accepted: typing.List[_Path] = [(*_first, -1)]
+    _candidates: typing.List[_Path] = []
+    _seen: typing.Set[typing.Tuple[int, ...]] = {tuple(_first[1])}
+    _distinct: typing.Dict[typing.Hashable, _Path] = {_key(_first[1]): _accepted[0]}
+
+    while len(_distinct) < k:
+        for candidate in _deviations(
+            _adjacency, _sources, _targets, _accepted, max_cost
+        ):
+            if tuple(candidate[1]) not in _seen:
+                _seen.add(tuple(candidate[1]))
+                heapq.heappush(_candidates, candidate)
+
+        if not _candidates:
+            break
+        _accepted.append(heapq.heappop(_candidates))
+        _distinct.setdefault(_key(_accepted[-1][1]), _accepted[-1])
+
+    return [(cost, path) for cost, path, _ in _distinct.values()]
@@ -0,0 +1,217 @@
+import dataclasses
+import typing
+
+import igraph
+import numpy
+
+from railostools.rly.columnar import RlyColumns
+from railostools.rly.port_graph import port_track_values
+from railostools.rly.relations import PORT_TABLE, SIGNALS
+
+
+def segment_ends(columns: RlyColumns) -> numpy.ndarray:
+    """Identify the elements which remain vertices of the segment graph.
+
+    These are all elements not having exactly two neighbours, such as buffers
+    and exits, along with points, crossings and any other element with more
+    than two ports whether or not all are connected, signals and elements at
+    the boundary of a named location.
+
+    Returns
+    -------
+    numpy.ndarray
+        boolean array with one entry per active element
+    """
+    _degree = numpy.diff(columns.neighbour_indptr)
+    _ends = (
+        (_degree != 2)
+        | (PORT_TABLE[columns.element_id].sum(axis=1) > 2)
+        | numpy.isin(columns.element_id, numpy.array([int(s) for s in SIGNALS]))
+    )
+
+    _sources = numpy.repeat(numpy.arange(len(_degree)), _degree)
+    _names = columns.active_element_name
+    _ends[_sources[_names[_sources] != _names[columns.neighbour_indices]]] = True
+
+    return _ends
+
+
+def _trace_segments(
+    ends: numpy.ndarray, indptr: typing.List[int], indices: typing.List[int]
+) -> typing.Tuple[typing.List[typing.Tuple[int, int]], typing.List[typing.List[int]]]:
+    """Follow each chain of elements leading away from the segment ends.
+
+    Elements which close a loop of plain track are marked in ``ends``.
+
+    Returns
+    -------
+    Tuple[List[Tuple[int, int]], List[List[int]]]
+        end elements and the elements between them for each segment
+    """
+    _visited = numpy.zeros(len(ends), dtype=bool)
+    _edges: typing.List[typing.Tuple[int, int]] = []
+    _cells: typing.List[typing.List[int]] = []
+
+    def _walk(start: int, first: int) -> None:
+        _chain: typing.List[int] = []
+        _previous, _current = start, first
+        while not ends[_current]:
+            _visited[_current] = True
+            _chain.append(_current)
+            _next = [
+                n
+                for n in indices[indptr[_current] : indptr[_current + 1]]
+                if n != _previous
+            ]
+            if not _next:
+                # Only reached where elements share a position, the chain
+                # then ending at the last element reached
+                ends[_chain.pop()] = True
+                break
+            _previous, _current = _current, _next[0]
+        _edges.append((start, _current))
+        _cells.append(_chain)
+
+    for start in numpy.flatnonzero(ends).tolist():
+        for first in indices[indptr[start] : indptr[start + 1]]:
+            if ends[first] and start < first:
+                _edges.append((start, first))
+                _cells.append([])
+            elif not ends[first] and not _visited[first]:
+                _walk(start, first)
+
+    # Closed loops of plain track have no ends so one element of each
+    # is made a vertex
+    for start in numpy.flatnonzero(~ends & ~_visited).tolist():
+        if not _visited[start]:
+            ends[start] = True
+            _walk(start, indices[indptr[start]])
+
+    return _edges, _cells
+
+
+def _segment_steps(
+    columns: RlyColumns,
+    edges: typing.List[typing.Tuple[int, int]],
+    cells: typing.List[typing.List[int]],
+) -> typing.List[typing.Tuple[numpy.ndarray, numpy.ndarray]]:
+    """Find the length and speed limit of each step along every segment.
+
+    A step joins the centres of two neighbouring elements, covering half the
+    track through the facing port of each.
+
+    Returns
+    -------
+    List[Tuple[numpy.ndarray, numpy.ndarray]]
+        lengths and speed limits of the steps making up each segment
+    """
+    _sources, _targets, _ports = columns.neighbour_pairs()
+    _halves = port_track_values(columns, columns.length) / 2
+    _speed_limits = port_track_values(columns, columns.speed_limit)
+    _step_lengths = _halves[_sources, _ports] + _halves[_targets, 10 - _ports]
+    _step_speed_limits = numpy.minimum(
+        _speed_limits[_sources, _ports], _speed_limits[_targets, 10 - _ports]
+    )
+    _step_of: typing.Dict[typing.Tuple[int, int], int] = {
+        pair: i for i, pair in enumerate(zip(_sources.tolist(), _targets.tolist()))
+    }
+
+    _steps: typing.List[typing.Tuple[numpy.ndarray, numpy.ndarray]] = []
+    for (start, end), chain in zip(edges, cells):
+        _path = [start, *chain, end]
+        _indices = [_step_of[pair] for pair in zip(_path[:-1], _path[1:])]
+        _steps.append((_step_lengths[_indices], _step_speed_limits[_indices]))
+    return _steps
+
+
+@dataclasses.dataclass
+class SegmentGraph:
+    """Railway graph with chains of plain track collapsed into single edges.
+
+    Each vertex is an element identified by ``segment_ends``, and each edge a
+    run of two-neighbour elements between two such vertices. Edges run
+    between the centres of their end elements, so each length includes half
+    the track through each end element along with the elements within the
+    run. Speed limits are the lowest of the tracks covered. Lengths thus add
+    up along a path as in ``RlyParser.adjacency``.
+    """
+
+    vertex_elements: numpy.ndarray
+    edges: numpy.ndarray
+    lengths: numpy.ndarray
+    speed_limits: numpy.ndarray
+    cells: typing.List[numpy.ndarray]
+    segment_of: numpy.ndarray
+
+    @classmethod
+    def from_columns(cls, columns: RlyColumns) -> "SegmentGraph":
+        """Build the segment graph of a railway"""
+        _n_elements: int = len(columns.element_id)
+        _ends = segment_ends(columns)
+        _edges, _cells = _trace_segments(
+            _ends,
+            columns.neighbour_indptr.tolist(),
+            columns.neighbour_indices.tolist(),
+        )
+
+        _segment_of = numpy.full(_n_elements, -1, dtype=numpy.int64)
+        for segment, cells in enumerate(_cells):
+            _segment_of[cells] = segment
+
+        _vertex_elements = numpy.flatnonzero(_ends)
+        _vertex_of = numpy.full(_n_elements, -1, dtype=numpy.int64)
+        _vertex_of[_vertex_elements] = numpy.arange(len(_vertex_elements))
+        _cell_arrays = [numpy.array(c, dtype=numpy.int64) for c in _cells]
+        _steps = _segment_steps(columns, _edges, _cells)
+
+        return cls(
+            vertex_elements=_vertex_elements,
+            edges=_vertex_of[numpy.array(_edges, dtype=numpy.int64).reshape(-1, 2)],
+            lengths=numpy.array([lengths.sum() for lengths, _ in _steps]),
+            speed_limits=numpy.array(
+                [speed_limits.min() for _, speed_limits in _steps], dtype=numpy.int64
+            ),
+            cells=_cell_arrays,
+            segment_of=_segment_of,
+        )
+
+    def element_location(self, element_index: int) -> typing.Tuple[str, int]:
+        """Find where an element lies within the segment graph.
+
+        Returns
+        -------
+        Tuple[str, int]
+            ``("vertex", i)`` if the element is vertex ``i``, otherwise
+            ``("edge", j)`` for the edge ``j`` it has been merged into
+        """
+        if self.segment_of[element_index] >= 0:
+            return "edge", int(self.segment_of[element_index])
+        return "vertex", int(numpy.searchsorted(self.vertex_elements, element_index))
+
+    def to_igraph(self, columns: RlyColumns) -> igraph.Graph:
+        """Convert to an undirected igraph graph.
+
+        Vertices carry the element index and position, edges the length,
+        speed limit and positions of the cells they replace.
+        """
+        _graph = igraph.Graph()
+        _graph.add_vertices(
+            len(self.vertex_elements),
+            attributes={
+                "element": self.vertex_elements.tolist(),
+                "x": columns.x[self.vertex_elements].tolist(),
+                "y": columns.y[self.vertex_elements].tolist(),
+            },
+        )
+        _graph.add_edges(
+            self.edges.tolist(),
+            attributes={
+                "length": self.lengths.tolist(),
+                "speed_limit": self.speed_limits.tolist(),
+                "positions": [
+                    list(zip(columns.x[c].tolist(), columns.y[c].tolist()))
+                    for c in self.cells
+                ],
+            },
+        )
+        return _graph
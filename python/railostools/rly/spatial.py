@@ -0,0 +1,227 @@
+import dataclasses
+import heapq
+import typing
+
+import numpy
+
+from railostools.rly.columnar import RlyColumns
+
+# Kinds of railway item held in the index, in the order of their codes
+ITEM_KINDS: typing.Tuple[str, ...] = ("active", "inactive", "text")
+
+# Text is positioned in pixels rather than element cells
+TEXT_PIXELS_PER_CELL: int = 16
+
+# Maximum number of points held in a leaf of the tree
+_LEAF_SIZE: int = 32
+
+
+@dataclasses.dataclass
+class SpatialIndex:
+    """Static k-d tree over the positions of all items in a railway.
+
+    Points are held in ``positions`` in tree order, the items of each node
+    being a contiguous range ``start[i]:end[i]`` so that leaves can be
+    searched as array slices. Every node stores the bounding box of its
+    points as ``(x_min, y_min, x_max, y_max)``, and ``children`` holds the
+    two child nodes of each branch or -1 for leaves.
+    """
+
+    positions: numpy.ndarray
+    kinds: numpy.ndarray
+    indices: numpy.ndarray
+    start: numpy.ndarray
+    end: numpy.ndarray
+    bounds: numpy.ndarray
+    children: numpy.ndarray
+
+    @classmethod
+    def from_points(
+        cls, positions: numpy.ndarray, kinds: numpy.ndarray, indices: numpy.ndarray
+    ) -> "SpatialIndex":
+        """Build the tree by repeatedly splitting each node at its median.
+
+        Each split is along the wider axis of the node using a linear time
+        partition, giving an overall O(n log n) build.
+        """
+        _order = numpy.arange(len(positions))
+        _start: typing.List[int] = [0]
+        _end: typing.List[int] = [len(positions)]
+        _children: typing.List[typing.List[int]] = [[-1, -1]]
+        _bounds: typing.List[numpy.ndarray] = []
+
+        node = 0
+        while node < len(_start):
+            _points = positions[_order[_start[node] : _end[node]]]
+            _bounds.append(
+                numpy.concatenate((_points.min(axis=0), _points.max(axis=0)))
+                if len(_points)
+                else numpy.array([numpy.inf, numpy.inf, -numpy.inf, -numpy.inf])
+            )
+            if len(_points) > _LEAF_SIZE:
+                _axis = int(numpy.argmax(_bounds[-1][2:] - _bounds[-1][:2]))
+                _middle = len(_points) // 2
+                _range = slice(_start[node], _end[node])
+                _order[_range] = _order[_range][
+                    numpy.argpartition(_points[:, _axis], _middle)
+                ]
+                _children[node] = [len(_start), len(_start) + 1]
+                _start += [_start[node], _start[node] + _middle]
+                _end += [_start[node] + _middle, _end[node]]
+                _children += [[-1, -1], [-1, -1]]
+            node += 1
+
+        return cls(
+            positions=positions[_order],
+            kinds=kinds[_order],
+            indices=indices[_order],
+            start=numpy.array(_start, dtype=numpy.int64),
+            end=numpy.array(_end, dtype=numpy.int64),
+            bounds=numpy.array(_bounds, dtype=float).reshape(-1, 4),
+            children=numpy.array(_children, dtype=numpy.int64),
+        )
+
+    @classmethod
+    def from_columns(cls, columns: RlyColumns) -> "SpatialIndex":
+        """Index the active elements, inactive elements and text of a railway"""
+        _text = numpy.array([t.position for t in columns.text], dtype=float).reshape(
+            -1, 2
+        )
+        _groups = (
+            columns.positions.astype(float),
+            columns.inactive_positions.astype(float),
+            _text / TEXT_PIXELS_PER_CELL,
+        )
+        return cls.from_points(
+            numpy.concatenate(_groups),
+            numpy.concatenate(
+                [numpy.full(len(g), i, dtype=numpy.int8) for i, g in enumerate(_groups)]
+            ),
+            numpy.concatenate([numpy.arange(len(g)) for g in _groups]),
+        )
+
+    def _kind_mask(self, kinds: typing.Optional[typing.Iterable[str]]) -> numpy.ndarray:
+        _codes = [ITEM_KINDS.index(k) for k in (ITEM_KINDS if kinds is None else kinds)]
+        _mask = numpy.zeros(len(ITEM_KINDS), dtype=bool)
+        _mask[_codes] = True
+        return _mask
+
+    def _results(self, items: numpy.ndarray) -> typing.List[typing.Tuple[str, int]]:
+        return [
+            (ITEM_KINDS[k], i)
+            for k, i in zip(self.kinds[items].tolist(), self.indices[items].tolist())
+        ]
+
+    def window(
+        self,
+        bottom_left: typing.Tuple[float, float],
+        top_right: typing.Tuple[float, float],
+        kinds: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.List[typing.Tuple[str, int]]:
+        """Find all items within a rectangle, including its edges.
+
+        Parameters
+        ----------
+        bottom_left: Tuple[float, float]
+            lowest x and y coordinates of the rectangle
+        top_right: Tuple[float, float]
+            highest x and y coordinates of the rectangle
+        kinds: Iterable[str], optional
+            kinds of item to find out of 'active', 'inactive' and 'text',
+            by default all
+
+        Returns
+        -------
+        List[Tuple[str, int]]
+            kind of each item found and its index within its kind, ordered
+            by kind then index
+        """
+        _low = numpy.asarray(bottom_left, dtype=float)
+        _high = numpy.asarray(top_right, dtype=float)
+        _wanted = self._kind_mask(kinds)
+        _ranges: typing.List[numpy.ndarray] = []
+        _stack: typing.List[int] = [0]
+
+        while _stack:
+            node = _stack.pop()
+            _box = self.bounds[node]
+            if (_box[:2] > _high).any() or (_box[2:] < _low).any():
+                continue
+            _items = numpy.arange(self.start[node], self.end[node])
+            if (_box[:2] >= _low).all() and (_box[2:] <= _high).all():
+                _ranges.append(_items)
+            elif self.children[node, 0] < 0:
+                _points = self.positions[_items]
+                _ranges.append(
+                    _items[((_points >= _low) & (_points <= _high)).all(axis=1)]
+                )
+            else:
+                _stack.extend(self.children[node].tolist())
+
+        _found = numpy.concatenate(_ranges) if _ranges else numpy.zeros(0, dtype=int)
+        _found = _found[_wanted[self.kinds[_found]]]
+        return self._results(
+            _found[numpy.lexsort((self.indices[_found], self.kinds[_found]))]
+        )
+
+    def nearest(
+        self,
+        position: typing.Tuple[float, float],
+        k: int = 1,
+        kinds: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.List[typing.Tuple[str, int, float]]:
+        """Find the items closest to a position.
+
+        Nodes are visited in order of their distance from the position,
+        stopping once no unvisited node can hold a closer item.
+
+        Parameters
+        ----------
+        position: Tuple[float, float]
+            coordinates to search from
+        k: int, optional
+            number of items to find
+        kinds: Iterable[str], optional
+            kinds of item to find out of 'active', 'inactive' and 'text',
+            by default all
+
+        Returns
+        -------
+        List[Tuple[str, int, float]]
+            kind, index within its kind and distance of each item, closest first
+        """
+        if k <= 0:
+            return []
+
+        _point = numpy.asarray(position, dtype=float)
+        _wanted = self._kind_mask(kinds)
+        _best: typing.List[typing.Tuple[float, int]] = []
+        _queue: typing.List[typing.Tuple[float, int]] = [(0.0, 0)]
+
+        while _queue:
+            _node_distance, node = heapq.heappop(_queue)
+            if len(_best) == k and _node_distance > -_best[0][0]:
+                break
+            if self.children[node, 0] < 0:
+                _items = numpy.arange(self.start[node], self.end[node])
+                _items = _items[_wanted[self.kinds[_items]]]
+                _distances = numpy.hypot(*(self.positions[_items] - _point).T)
+                for distance, item in zip(_distances.tolist(), _items.tolist()):
+                    if len(_best) < k:
+                        heapq.heappush(_best, (-distance, item))
+                    elif distance < -_best[0][0]:
+                        heapq.heapreplace(_best, (-distance, item))
+                continue
+            for child in self.children[node].tolist():
+                _box = self.bounds[child]
+                _gap = numpy.maximum(
+                    numpy.maximum(_box[:2] - _point, _point - _box[2:]), 0
+                )
+                heapq.heappush(_queue, (float(numpy.hypot(*_gap)), child))
+
+        _ranked = sorted((-d, i) for d, i in _best)
+        _items = numpy.array([i for _, i in _ranked], dtype=numpy.int64)
+        return [
+            (kind, index, distance)
+            for (kind, index), (distance, _) in zip(self._results(_items), _ranked)
+        ]
@@ -0,0 +1,211 @@
+import io
+import itertools
+import re
+import typing
+
+import railostools.exceptions as railos_exc
+from railostools.common.enumeration import Elements
+
+SIGNAL_TYPES: typing.Dict[str, typing.Optional[str]] = {
+    "G": "ground",
+    "4": "4AT",
+    "3": "3AT",
+    "2": "2AT",
+    "*": None,
+}
+
+_ACTIVE_HEADER: str = "**Active elements**"
+_INACTIVE_HEADER: str = "**Inactive elements**"
+_SEPARATOR: str = "***"
+
+# Continuation elements which are linked in pairs to another element
+_CONNECTIONS: typing.FrozenSet[int] = frozenset(
+    e for e in Elements if e.name.startswith("Connection_")
+)
+
+# Number of lines describing a single text item
+_TEXT_ITEM_LINES: int = 8
+
+
+class MetadataRecord(typing.NamedTuple):
+    program_version: str
+    home_position: typing.Tuple[int, int]
+    n_active_elements: int
+
+
+class InactiveSectionRecord(typing.NamedTuple):
+    n_inactive_elements: int
+
+
+class ActiveRecord(typing.NamedTuple):
+    element_id: int
+    position: typing.Tuple[int, int]
+    length: typing.Tuple[int, typing.Optional[int]]
+    speed_limit: typing.Tuple[int, typing.Optional[int]]
+    location_name: typing.Optional[str]
+    active_element_name: typing.Optional[str]
+    signal: typing.Optional[str]
+    file_index: typing.Optional[int] = None
+    link: typing.Optional[int] = None
+
+
+class InactiveRecord(typing.NamedTuple):
+    element_id: int
+    position: typing.Tuple[int, int]
+    location_name: typing.Optional[str]
+
+
+class TextRecord(typing.NamedTuple):
+    position: typing.Tuple[int, int]
+    text_string: str
+    font_name: str
+    font_size: int
+    font_color: int
+    font_charset: int
+    font_style: int
+
+
+RlyRecord = typing.Union[
+    MetadataRecord, InactiveSectionRecord, ActiveRecord, InactiveRecord, TextRecord
+]
+
+
+def _optional_int(value: str) -> typing.Optional[int]:
+    return int(value) if value != "-1" else None
+
+
+def _metadata_record(fields: typing.List[str]) -> MetadataRecord:
+    if len(fields) < 4 or not (
+        _prog_version_re := re.findall(r"(v\d+\.\d+\.\d+)", fields[0])
+    ):
+        raise railos_exc.ParsingError("Failed to retrieve railway metadata.")
+    return MetadataRecord(
+        program_version=_prog_version_re[0],
+        home_position=(int(fields[1]), int(fields[2])),
+        n_active_elements=int(fields[3]),
+    )
+
+
+def _active_record(fields: typing.List[str], separator: str) -> ActiveRecord:
+    if len(fields) < 10:
+        raise railos_exc.ParsingError(
+            f"Expected 10 statements for active element but found {len(fields)}"
+        )
+    _element_id = int(fields[1])
+
+    # Points, signals and continuations carry extra attributes after the
+    # position, so the remaining fields are read from the end of the record
+    return ActiveRecord(
+        element_id=_element_id,
+        position=(int(fields[2]), int(fields[3])),
+        length=(int(fields[-6]), _optional_int(fields[-5])),
+        speed_limit=(int(fields[-4]), _optional_int(fields[-3])),
+        location_name=fields[-2] or None,
+        active_element_name=fields[-1] or None,
+        signal=SIGNAL_TYPES.get(separator[0]),
+        file_index=int(fields[0]),
+        link=int(fields[5]) if _element_id in _CONNECTIONS else None,
+    )
+
+
+def _inactive_record(fields: typing.List[str]) -> InactiveRecord:
+    if len(fields) < 5:
+        raise railos_exc.ParsingError(
+            f"Expected 5 statements for inactive element but found {len(fields)}"
+        )
+    return InactiveRecord(
+        element_id=int(fields[1]),
+        position=(int(fields[2]), int(fields[3])),
+        location_name=fields[4] or None,
+    )
+
+
+def _text_records(lines: typing.Iterator[str]) -> typing.Iterator[TextRecord]:
+    _n_items = next(lines, "")
+
+    if not _n_items.isdigit():
+        return
+
+    for _ in range(int(_n_items)):
+        _fields = [next(lines, None) for _ in range(_TEXT_ITEM_LINES)]
+        if _fields[-1] is None:
+            raise railos_exc.ParsingError("Unexpected end of file in text section.")
+        yield TextRecord(
+            position=(int(_fields[0]), int(_fields[1])),
+            text_string=_fields[2],
+            font_name=_fields[3],
+            font_size=int(_fields[4]),
+            font_color=int(_fields[5]),
+            font_charset=int(_fields[6]),
+            font_style=int(_fields[7]),
+        )
+
+
+def tokenize_lines(lines: typing.Iterable[str]) -> typing.Iterator[RlyRecord]:
+    """Convert the cleaned lines of a railway file into typed records.
+
+    Records are yielded in file order, the metadata first followed by
+    active elements, the inactive element count, inactive elements
+    and finally any text items.
+    """
+    _lines: typing.Iterator[str] = iter(lines)
+    _part: typing.List[str] = []
+    _n_inactive: typing.Optional[int] = None
+    _inactive_found: int = 0
+
+    for line in _lines:
+        if _ACTIVE_HEADER in line:
+            yield _metadata_record(_part)
+            _part = []
+        elif _INACTIVE_HEADER in line:
+            if not _part:
+                raise railos_exc.ParsingError("Missing inactive element count.")
+            _n_inactive = int(_part[-1])
+            yield InactiveSectionRecord(n_inactive_elements=_n_inactive)
+            _part = []
+            if not _n_inactive:
+                break
+        elif _SEPARATOR in line:
+            if _n_inactive is None:
+                yield _active_record(_part, line)
+            else:
+                yield _inactive_record(_part)
+                _inactive_found += 1
+                if _inactive_found == _n_inactive:
+                    break
+            _part = []
+        else:
+            _part.append(line)
+    else:
+        if _n_inactive is None:
+            raise railos_exc.ParsingError("Failed to retrieve data from file.")
+        raise railos_exc.ParsingError(
+            f"Expected {_n_inactive} inactive elements but found {_inactive_found}"
+        )
+
+    yield from _text_records(_lines)
+
+
+def _tokenize_raw_lines(
+    raw_lines: typing.Iterable[bytes],
+) -> typing.Iterator[RlyRecord]:
+    _lines = (line.decode("latin-1").replace("\0", "").strip() for line in raw_lines)
+    _first_line = next(_lines, None)
+    if _first_line is None:
+        raise railos_exc.ParsingError("Cannot parse empty file.")
+    yield from tokenize_lines(itertools.chain((_first_line,), _lines))
+
+
+def tokenize(rly_file: str) -> typing.Iterator[RlyRecord]:
+    """Stream the typed records of a railway file.
+
+    The file is read once through a buffered reader, each line being
+    decoded and cleaned as it is consumed.
+    """
+    with open(rly_file, "rb") as in_f:
+        yield from _tokenize_raw_lines(in_f)
+
+
+def tokenize_contents(contents: bytes) -> typing.Iterator[RlyRecord]:
+    """Stream the typed records of railway file content already read"""
+    return _tokenize_raw_lines(io.BytesIO(contents))
@@ -1,3 +1,4 @@
+import numpy
 import pytest
 import railostools.rly.relations as railos_rly_rel
 import railostools.common.enumeration as railos_enums
@@ -14,3 +15,54 @@ def test_example_connections() -> None:
         railos_enums.Elements.Junction_Up_Right_RightAngle,
         railos_enums.Elements.DiagonalUp,
     )
+
+
+def test_connection_placement() -> None:
+    assert railos_rly_rel.can_connect(
+        railos_enums.Elements.Horizontal,
+        railos_enums.Elements.Horizontal,
+        (0, 0),
+        (1, 0),
+    )
+    assert not railos_rly_rel.can_connect(
+        railos_enums.Elements.DiagonalDown,
+        railos_enums.Elements.DiagonalDown,
+        (0, 0),
+        (-1, 1),
+    )
+    assert not railos_rly_rel.can_connect(
+        railos_enums.Elements.Horizontal,
+        railos_enums.Elements.Horizontal,
+        (0, 0),
+        (2, 0),
+    )
+
+
+def test_connections_vectorised() -> None:
+    _types_one = numpy.array(
+        [railos_enums.Elements.Horizontal, railos_enums.Elements.DiagonalDown] * 2
+    )
+    _types_two = numpy.array(
+        [railos_enums.Elements.Horizontal, railos_enums.Elements.DiagonalDown] * 2
+    )
+    _coords_one = numpy.zeros((4, 2), dtype=int)
+    _coords_two = numpy.array([(-1, 0), (-1, 1), (3, 0), (1, 1)])
+    assert railos_rly_rel.can_connect_many(
+        _types_one, _types_two, _coords_one, _coords_two
+    ).tolist() == [True, False, False, True]
+    assert railos_rly_rel.can_connect_many(_types_one, _types_two).all()
+
+
+def test_diagonal_branch_connections() -> None:
+    assert railos_rly_rel.can_connect(
+        railos_enums.Elements.Up_DiagonalUp,
+        railos_enums.Elements.DiagonalUp,
+        (0, 0),
+        (1, -1),
+    )
+    assert railos_rly_rel.can_connect(
+        railos_enums.Elements.Junction_DiagonalUp_Up_45Angle,
+        railos_enums.Elements.Right_DiagonalUp,
+        (0, 0),
+        (-1, 1),
+    )
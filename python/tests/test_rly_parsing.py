@@ -1,9 +1,19 @@
 import pytest
+import dataclasses
 import json
 import os
+import shutil
 import tempfile
+import typing
 
-from railostools.rly.parsing import RlyParser
+import igraph
+import numpy
+
+from railostools.common.enumeration import Elements
+from railostools.rly.diff import diff_railways
+from railostools.rly.parsing import RlyParser, RlyStoreStats
+from railostools.rly.plotting import element_segments
+import railostools.exceptions as railos_exc
 
 RLY_FILE = os.path.join(os.path.dirname(__file__), "data", "Antwerpen_Centraal.rly")
 
@@ -15,12 +25,29 @@ def rly_parser():
     return _rly_parser
 
 
+# Record of the track element at (21, 1) beside the Hoboken exit
+HOBOKEN_TRACK = b"\r\n3\r\n21\r\n21\r\n1\r\n"
+
+
+def _edited_railway(temp_d: str, *replacements: typing.Tuple[bytes, bytes]) -> str:
+    """Copy the test railway into a directory, replacing parts of its contents"""
+    _rly_file = shutil.copy(RLY_FILE, temp_d)
+    with open(_rly_file, "rb") as in_f:
+        _contents = in_f.read()
+    for old, new in replacements:
+        _contents = _contents.replace(old, new)
+    with open(_rly_file, "wb") as out_f:
+        out_f.write(_contents)
+    return _rly_file
+
+
 @pytest.mark.rly_parsing
 def test_parse_result(rly_parser: RlyParser):
     assert rly_parser.program_version == "v2.9.2"
     assert rly_parser.n_active_elements == 1274
     assert rly_parser.n_inactive_elements == 200
 
+
 @pytest.mark.rly_parsing
 def test_write(rly_parser: RlyParser):
     with tempfile.NamedTemporaryFile(suffix=".json", mode="w", delete=False) as out_f:
@@ -41,3 +68,520 @@ def test_plot_nodes(rly_parser: RlyParser):
         graph_file_name: str = os.path.join(temp_d, "temporary_graph.pdf")
         rly_parser.plot(graph_file_name)
         assert os.path.exists(graph_file_name)
+
+
+@pytest.mark.rly_parsing
+def test_get_element_at(rly_parser: RlyParser):
+    assert rly_parser.get_element_at((23, 0)) == Elements.Exit_Up
+    assert rly_parser.get_element_at((10000, 10000)) is None
+    with pytest.raises(railos_exc.RailwayParsingError):
+        RlyParser().get_element_at((23, 0))
+
+
+@pytest.mark.rly_parsing
+def test_neighbours_are_mutual(rly_parser: RlyParser):
+    _neighbours = {
+        tuple(element.position): element.neighbours
+        for element in rly_parser.active_elements
+    }
+    for position, neighbours in _neighbours.items():
+        for neighbour in neighbours:
+            assert position in _neighbours[neighbour]
+
+
+@pytest.mark.rly_parsing
+def test_node_map(rly_parser: RlyParser):
+    assert rly_parser.nodes.vcount() == rly_parser.n_active_elements
+    _vertex = rly_parser.nodes.vs[rly_parser.vertex_ids[(-28, 28)]]
+    assert (_vertex["x"], _vertex["y"]) == (-28, 28)
+    assert sorted((v["x"], v["y"]) for v in _vertex.neighbors()) == sorted(
+        rly_parser.get_element_connected_neighbours((-28, 28))
+    )
+
+
+@pytest.mark.rly_parsing
+def test_parse_sections(rly_parser: RlyParser):
+    assert len(rly_parser.inactive_elements) == rly_parser.n_inactive_elements
+    assert rly_parser.inactive_elements[0].element_id == Elements.Platform_Up
+    _text = rly_parser.data["Antwerpen_Centraal"].text
+    assert len(_text) == 23
+    assert _text[0].text_string == "NIV +1"
+    assert _text[0].font.name == "Arial"
+
+
+@pytest.mark.rly_parsing
+def test_parse_empty_file():
+    with tempfile.TemporaryDirectory() as temp_d:
+        _empty_file = os.path.join(temp_d, "empty.rly")
+        open(_empty_file, "w").close()
+        with pytest.raises(railos_exc.ParsingError):
+            RlyParser().parse(_empty_file)
+
+
+@pytest.mark.rly_parsing
+def test_columnar_parse(rly_parser: RlyParser):
+    _columnar_parser = RlyParser(columnar=True)
+    _columnar_parser.parse(RLY_FILE)
+    assert not _columnar_parser._rly_data
+    assert _columnar_parser.n_points == rly_parser.n_points
+    assert _columnar_parser.n_signals == rly_parser.n_signals
+    assert _columnar_parser.n_level_crossings == rly_parser.n_level_crossings
+    assert len(_columnar_parser.columns.element_id) == rly_parser.n_active_elements
+    assert _columnar_parser.nodes.ecount() == rly_parser.nodes.ecount()
+    assert _columnar_parser.active_elements == rly_parser.active_elements
+
+
+@pytest.mark.rly_parsing
+def test_parse_cache(rly_parser: RlyParser):
+    with tempfile.TemporaryDirectory() as temp_d:
+        _cold_parser = RlyParser(cache_dir=temp_d)
+        _cold_parser.parse(RLY_FILE)
+        assert _cold_parser._cache.digest(RLY_FILE) in _cold_parser._cache
+        _warm_parser = RlyParser(cache_dir=temp_d)
+        _warm_parser.parse(RLY_FILE)
+        assert _warm_parser.data == rly_parser.data
+        assert _warm_parser.nodes.get_edgelist() == rly_parser.nodes.get_edgelist()
+
+
+@pytest.mark.rly_parsing
+def test_summary(rly_parser: RlyParser):
+    _summary = rly_parser.summary()
+    assert _summary.n_points == rly_parser.n_points == 179
+    assert _summary.n_signals == rly_parser.n_signals
+    assert _summary.n_stations == rly_parser.n_stations
+    assert rly_parser.named_locations is rly_parser.named_locations
+    rly_parser.parse(RLY_FILE)
+    assert not rly_parser._derived
+
+
+@pytest.mark.rly_parsing
+@pytest.mark.parametrize(
+    "name",
+    [
+        "n_signals",
+        "n_points",
+        "n_level_crossings",
+        "n_stations",
+        "named_locations",
+        "tables",
+    ],
+)
+def test_derived_before_parse(name: str):
+    with pytest.raises(railos_exc.RailwayParsingError):
+        getattr(RlyParser(), name)
+
+
+@pytest.mark.rly_parsing
+def test_named_locations(rly_parser: RlyParser):
+    _locations = rly_parser.named_locations
+    assert len(_locations) == 25
+    assert not _locations["Berlaar"].start_positions
+    assert [
+        (_start.start_coordinate, _start.end_coordinate)
+        for _start in _locations["Boechout spoor 1"].start_positions
+    ] == [((-13, 43), (-12, 43))]
+
+
+@pytest.mark.rly_parsing
+def test_store_eviction():
+    _parser = RlyParser(columnar=True, max_railways=2)
+    with tempfile.TemporaryDirectory() as temp_d:
+        for name in ("first", "second", "third"):
+            shutil.copy(RLY_FILE, os.path.join(temp_d, f"{name}.rly"))
+        _parser.parse(os.path.join(temp_d, "first.rly"))
+        _parser.parse(os.path.join(temp_d, "second.rly"))
+        assert _parser["first"]
+        _parser.parse(os.path.join(temp_d, "third.rly"))
+    assert sorted(_parser.keys()) == ["first", "third"]
+    with pytest.raises(KeyError):
+        _parser["second"]
+    assert _parser.store_stats == RlyStoreStats(hits=1, misses=1, evictions=1)
+    # Accessors of the current railway update recency without counting as
+    # lookups, so here the railway looked up by key is evicted next
+    assert _parser["first"]
+    assert _parser.active_elements and _parser.nodes
+    assert _parser.store_stats.hits == 2
+    with tempfile.TemporaryDirectory() as temp_d:
+        shutil.copy(RLY_FILE, os.path.join(temp_d, "fourth.rly"))
+        _parser.parse(os.path.join(temp_d, "fourth.rly"))
+    assert sorted(_parser.keys()) == ["fourth", "third"]
+
+    _budget_parser = RlyParser(max_bytes=1)
+    _budget_parser.parse(RLY_FILE)
+    assert list(_budget_parser.keys()) == ["Antwerpen_Centraal"]
+    assert _budget_parser.nbytes > 1
+
+
+@pytest.mark.rly_parsing
+def test_plot_coordinates(rly_parser: RlyParser):
+    with tempfile.TemporaryDirectory() as temp_d:
+        graph_file_name: str = os.path.join(temp_d, "temporary_railway.png")
+        rly_parser.plot(graph_file_name, coordinates=True)
+        assert os.path.exists(graph_file_name)
+
+
+@pytest.mark.rly_parsing
+def test_level_crossing_segments(rly_parser: RlyParser):
+    _element_ids = rly_parser.columns.element_id.copy()
+    _crossing = rly_parser.vertex_ids[(21, 1)]
+    _element_ids[_crossing] = Elements.Level_Crossing
+    _segments = element_segments(
+        dataclasses.replace(rly_parser.columns, element_id=_element_ids)
+    )["level_crossings"]
+    assert len(_segments) == 2
+    assert (_segments.mean(axis=1) == (21, 1)).all()
+
+
+@pytest.mark.rly_parsing
+def test_port_graph(rly_parser: RlyParser):
+    _graph = rly_parser.port_graph
+    assert _graph.is_directed()
+    # Points at (-28, 28) may only be traversed to or from the trunk
+    _points = _graph.vs.select(x=-28, y=28)
+    assert sorted((v["port"], len(v.successors())) for v in _points) == [
+        (2, 1),
+        (4, 1),
+        (8, 2),
+    ]
+    # Only jumps between linked continuations cover no distance
+    assert all(
+        (e["length"] > 0) != (_graph.vs[e.target]["port"] == 5)
+        for e in _graph.es
+        if _graph.vs[e.source]["port"] != 5
+    )
+
+
+@pytest.mark.rly_parsing
+def test_signal_element_fields(rly_parser: RlyParser):
+    _signal = next(
+        e for e in rly_parser.active_elements if tuple(e.position) == (66, 15)
+    )
+    assert _signal.element_id == Elements.Signal_Right
+    assert tuple(_signal.length) == (61, None)
+    assert tuple(_signal.speed_limit) == (90, None)
+    assert _signal.location_name is None
+
+
+@pytest.mark.rly_parsing
+def test_segment_graph(rly_parser: RlyParser):
+    _graph = rly_parser.segment_graph
+    assert _graph.vcount() < rly_parser.nodes.vcount()
+    assert len(_graph.connected_components()) == len(
+        rly_parser.nodes.connected_components()
+    )
+    _merged = sum(len(e["positions"]) for e in _graph.es)
+    assert _merged + _graph.vcount() == rly_parser.n_active_elements
+    _kind, _index = rly_parser.get_segment_at((-28, 28))
+    assert _kind == "vertex"
+    assert (_graph.vs[_index]["x"], _graph.vs[_index]["y"]) == (-28, 28)
+    assert rly_parser.get_segment_at((10000, 10000)) is None
+
+
+@pytest.mark.rly_parsing
+def test_segment_graph_junctions():
+    with tempfile.TemporaryDirectory() as temp_d:
+        # Move away the trunk track of the points at (-28, 28), leaving only
+        # its two legs connected
+        _rly_file = _edited_railway(
+            temp_d,
+            (b"\r\n552\r\n3\r\n-28\r\n27\r\n", b"\r\n552\r\n3\r\n-28\r\n-99\r\n"),
+        )
+        _parser = RlyParser(columnar=True)
+        _parser.parse(_rly_file)
+    assert len(_parser.get_element_connected_neighbours((-28, 28))) == 2
+    assert _parser.get_segment_at((-28, 28))[0] == "vertex"
+
+
+@pytest.mark.rly_parsing
+def test_segment_graph_distances(rly_parser: RlyParser):
+    _graph = rly_parser.segment_graph
+    assert min(_graph.es["length"]) > 0 and min(_graph.es["speed_limit"]) > 0
+    # Distances between vertices match those through every element, leaving
+    # out the zero length links between continuations
+    _matrix = rly_parser.adjacency(weight="length")
+    _rows = numpy.repeat(numpy.arange(_matrix.shape[0]), numpy.diff(_matrix.indptr))
+    _steps = _matrix.weights > 0
+    _elements = igraph.Graph(
+        _matrix.shape[0],
+        list(zip(_rows[_steps].tolist(), _matrix.indices[_steps].tolist())),
+        directed=True,
+        edge_attrs={"length": _matrix.weights[_steps].tolist()},
+    )
+    _origin = _graph.vs.find(x=20, y=1)
+    (_expected,) = _elements.distances(
+        _origin["element"], _graph.vs["element"], weights="length"
+    )
+    assert _graph.distances(_origin, weights="length")[0] == pytest.approx(_expected)
+
+
+@pytest.mark.rly_parsing
+def test_block_graph(rly_parser: RlyParser):
+    _graph = rly_parser.block_graph
+    assert _graph.is_directed()
+    assert len(_graph.vs.select(signal_ne=-1)) == rly_parser.n_signals
+    assert all(v["length"] > 0 and v["speed_limit"] > 0 for v in _graph.vs)
+    # A block runs from its signal in the signal's direction
+    _block = _graph.vs.find(x=24, y=2)
+    assert _block["positions"][:3] == [(24, 2), (24, 3), (24, 4)]
+    assert rly_parser.block_graph is _graph
+
+
+@pytest.mark.rly_parsing
+def test_diagnostics(rly_parser: RlyParser):
+    assert rly_parser.diagnostics.ok
+    assert rly_parser.diagnostics is rly_parser.diagnostics
+    with tempfile.TemporaryDirectory() as temp_d:
+        # Move the track next to the Hoboken exit down by one row
+        _rly_file = _edited_railway(
+            temp_d, (HOBOKEN_TRACK, b"\r\n3\r\n21\r\n21\r\n2\r\n")
+        )
+        _parser = RlyParser()
+        _parser.parse(_rly_file)
+        _diagnostics = _parser.diagnostics
+        assert not _diagnostics.ok
+        assert _diagnostics.n_components == 2
+        _exit = _parser.vertex_ids[(20, 1)]
+        assert _diagnostics.components[_exit] == 1
+        assert _diagnostics.dangling.tolist() == [[_exit, 6], [8, 1]]
+        assert _diagnostics.unreachable_exits.tolist() == [_exit]
+
+
+@pytest.mark.rly_parsing
+def test_spatial_queries(rly_parser: RlyParser):
+    _columns = rly_parser.columns
+    _in_window = rly_parser.get_elements_in_window((20, 0), (30, 5))
+    _active = [i for kind, i in _in_window if kind == "active"]
+    assert _active == [
+        i
+        for i, (x, y) in enumerate(_columns.positions.tolist())
+        if 20 <= x <= 30 and 0 <= y <= 5
+    ]
+    assert all(
+        kind == "text"
+        for kind, _ in rly_parser.get_elements_in_window((20, 0), (30, 5), ["text"])
+    )
+    _nearest = rly_parser.get_nearest_elements((25.3, 3.2), k=4, kinds=["active"])
+    _distances = sorted(
+        ((x - 25.3) ** 2 + (y - 3.2) ** 2) ** 0.5
+        for x, y in _columns.positions.tolist()
+    )
+    assert [d for *_, d in _nearest] == pytest.approx(_distances[:4])
+    _kind, _index, _ = rly_parser.get_nearest_elements((20, 1))[0]
+    assert (_kind, tuple(_columns.positions[_index])) == ("active", (20, 1))
+    assert rly_parser.get_nearest_elements((0, 0), k=0) == []
+    assert rly_parser.get_elements_in_window((20, 0), (30, 5), kinds=[]) == []
+    assert rly_parser.get_nearest_elements((0, 0), kinds=[]) == []
+
+
+@pytest.mark.rly_parsing
+def test_adjacency(rly_parser: RlyParser):
+    _matrix = rly_parser.adjacency()
+    assert _matrix.shape == (1274, 1274)
+    assert len(_matrix.indptr) == 1275
+    assert len(_matrix.indices) == len(_matrix.weights) == _matrix.indptr[-1]
+    _row = rly_parser.vertex_ids[(21, 2)]
+    assert tuple(_matrix.coordinates[_row]) == (21, 2)
+    _neighbours = _matrix.indices[_matrix.indptr[_row] : _matrix.indptr[_row + 1]]
+    assert sorted(tuple(_matrix.coordinates[n]) for n in _neighbours) == sorted(
+        rly_parser.get_element_connected_neighbours((21, 2))
+    )
+    assert (_matrix.weights >= 0).all()
+    _times = rly_parser.adjacency(weight="time")
+    assert (_times.indices == _matrix.indices).all()
+    assert (_times.weights <= _matrix.weights).all()
+    with pytest.raises(ValueError):
+        rly_parser.adjacency(format="coo")
+
+
+@pytest.mark.rly_parsing
+def test_route(rly_parser: RlyParser):
+    _route = rly_parser.route("Hoboken", "Luchtbal")
+    assert _route.path[0] == (20, 2)
+    assert _route.path[-1] == (75, 17)
+    assert _route.distance > 0
+    assert _route.time > _route.distance / (200 / 3.6)
+    assert rly_parser.route("Hoboken", "Luchtbal") is _route
+    assert rly_parser.route((20, 2), (22, 4)).path == [
+        (20, 2),
+        (21, 2),
+        (22, 3),
+        (22, 4),
+    ]
+    with pytest.raises(railos_exc.RoutingError):
+        rly_parser.route("Hoboken", "Nowhere")
+
+
+@pytest.mark.rly_parsing
+def test_alternative_routes(rly_parser: RlyParser):
+    _routes = rly_parser.alternative_routes("Hoboken", "Luchtbal", k=5)
+    assert len(_routes) == 5
+    _quickest = rly_parser.route("Hoboken", "Luchtbal")
+    assert _routes[0].path == _quickest.path
+    assert _routes[0].time == pytest.approx(_quickest.time)
+    assert [r.time for r in _routes] == sorted(r.time for r in _routes)
+    _shortest = rly_parser.alternative_routes(
+        "Hoboken", "Luchtbal", k=5, weight="distance", max_cost=6600
+    )
+    assert _shortest
+    assert all(r.distance <= 6600 for r in _shortest)
+    assert not rly_parser.alternative_routes("Hoboken", "Luchtbal", max_cost=100)
+    assert rly_parser.alternative_routes("Hoboken", "Luchtbal", k=0) == []
+    # Leaving the points at (-28, 28) through any of its ports is one route
+    _from_points = rly_parser.alternative_routes((-28, 28), "Lier", k=4)
+    assert len({tuple(r.path) for r in _from_points}) == len(_from_points) == 4
+    assert len(rly_parser.alternative_routes((-28, 28), (-28, 31), k=3)) == 1
+
+
+def _edge_names(parser: RlyParser):
+    _names = parser.nodes.vs["name"]
+    return sorted(
+        tuple(sorted((_names[i], _names[j]))) for i, j in parser.nodes.get_edgelist()
+    )
+
+
+@pytest.mark.rly_parsing
+@pytest.mark.parametrize(
+    "edit,patched",
+    [
+        (b"\r\n3\r\n1\r\n21\r\n1\r\n", True),
+        (b"\r\n3\r\n21\r\n21\r\n2\r\n", False),
+    ],
+    ids=["retype", "move"],
+)
+def test_incremental_parse(edit: bytes, patched: bool):
+    with tempfile.TemporaryDirectory() as temp_d:
+        _rly_file = shutil.copy(RLY_FILE, temp_d)
+        _parser = RlyParser()
+        _parser.parse(_rly_file)
+        _graph = _parser.nodes
+        _unchanged = _parser.active_elements[100]
+        _parser.parse(_edited_railway(temp_d, (HOBOKEN_TRACK, edit)), incremental=True)
+        _full = RlyParser()
+        _full.parse(_rly_file)
+    assert _parser.active_elements[100] is _unchanged
+    assert _parser.data == _full.data
+    assert _edge_names(_parser) == _edge_names(_full)
+    assert _parser.nodes.vs["name"] == _full.nodes.vs["name"]
+    assert (_parser.columns.neighbour_indices == _full.columns.neighbour_indices).all()
+    # Only an element replaced at the same index allows the graph to be patched
+    assert (_parser.nodes is _graph) == patched
+
+
+@pytest.mark.rly_parsing
+def test_save_load_graph(rly_parser: RlyParser):
+    with tempfile.TemporaryDirectory() as temp_d:
+        _graph_file = os.path.join(temp_d, "Antwerpen_Centraal.npz")
+        rly_parser.save_graph(_graph_file)
+        _loaded = RlyParser(columnar=True)
+        _loaded.load_graph(_graph_file)
+    assert list(_loaded.keys()) == ["Antwerpen_Centraal"]
+    assert _loaded.nodes.get_edgelist() == rly_parser.nodes.get_edgelist()
+    assert _loaded.nodes.vs["name"] == rly_parser.nodes.vs["name"]
+    assert _loaded.n_active_elements == rly_parser.n_active_elements
+    assert _loaded.named_locations.keys() == rly_parser.named_locations.keys()
+    assert (
+        _loaded.route("Hoboken", "Luchtbal").path
+        == rly_parser.route("Hoboken", "Luchtbal").path
+    )
+
+
+@pytest.mark.rly_parsing
+def test_location_matrix():
+    with tempfile.TemporaryDirectory() as temp_d:
+        _rly_file = shutil.copy(RLY_FILE, temp_d)
+        _parser = RlyParser(columnar=True)
+        _parser.parse(_rly_file)
+        _matrix_file = os.path.join(temp_d, "Antwerpen_Centraal.locations.npz")
+        _matrix = _parser.location_matrix(persist=False)
+        assert not os.path.exists(_matrix_file)
+        assert _parser.location_matrix() is _matrix
+        assert os.path.exists(_matrix_file)
+        _route = _parser.route("Hoboken", "Luchtbal")
+        assert _matrix.distance_between("Hoboken", "Luchtbal") == _route.distance
+        assert _matrix.time_between("Hoboken", "Luchtbal") == pytest.approx(_route.time)
+        _reloaded = RlyParser(columnar=True)
+        _reloaded.parse(_rly_file)
+        assert (_reloaded.location_matrix().distance == _matrix.distance).all()
+
+        # Matrices are saved against the railway as parsed, so are not
+        # loaded for a railway edited since
+        _stale = RlyParser(columnar=True)
+        _stale.parse(_rly_file)
+        _edited = _edited_railway(
+            temp_d,
+            (
+                b"\r\n2\r\n22\r\n5\r\n200\r\n-1\r\n120\r\n",
+                b"\r\n2\r\n22\r\n5\r\n250\r\n-1\r\n120\r\n",
+            ),
+        )
+        os.remove(_matrix_file)
+        _stale.location_matrix()
+        _updated = RlyParser(columnar=True)
+        _updated.parse(_edited)
+        assert (
+            _updated.location_matrix().distance_between("Hoboken", "Luchtbal")
+            == _updated.route("Hoboken", "Luchtbal").distance
+            != _route.distance
+        )
+
+
+@pytest.mark.rly_parsing
+def test_diff_railways():
+    assert not diff_railways(RLY_FILE, RLY_FILE)
+    with tempfile.TemporaryDirectory() as temp_d:
+        _rly_file = _edited_railway(
+            temp_d,
+            (HOBOKEN_TRACK, b"\r\n3\r\n1\r\n21\r\n1\r\n"),
+            (
+                b"\r\n20\r\n1\r\n100\r\n-1\r\n200\r\n",
+                b"\r\n20\r\n1\r\n150\r\n-1\r\n160\r\n",
+            ),
+            (b"Hoboken\x00", b"Hoboken Polder\x00"),
+        )
+        _diff = diff_railways(RLY_FILE, _rly_file)
+    assert _diff.retyped == [("active", (21, 1), "Right_DiagonalDown", "Horizontal")]
+    assert _diff.renamed_locations == [("Hoboken", "Hoboken Polder")]
+    assert _diff.changed_lengths == [((20, 1), (100, -1), (150, -1))]
+    assert _diff.changed_speed_limits == [((20, 1), (200, -1), (160, -1))]
+    assert _diff.disconnected == [((21, 1), (22, 2))]
+    assert not _diff.added and not _diff.removed and not _diff.connected
+
+
+@pytest.mark.rly_parsing
+def test_parse_many():
+    _parser = RlyParser(columnar=True)
+    with tempfile.TemporaryDirectory() as temp_d:
+        _missing = os.path.join(temp_d, "Missing.rly")
+        _results = _parser.parse_many([RLY_FILE, _missing, RLY_FILE], workers=2)
+    assert [r.path for r in _results] == [RLY_FILE, _missing, RLY_FILE]
+    assert [r.ok for r in _results] == [True, False, True]
+    assert _results[1].columns is None
+    assert "FileNotFoundError" in _results[1].error
+    assert all(r.seconds >= 0 for r in _results)
+    assert _results[0].columns.n_active_elements == 1274
+    assert list(_parser.keys()) == ["Antwerpen_Centraal"]
+    assert _parser.route("Hoboken", "Luchtbal").distance == 6656
+
+
+@pytest.mark.rly_parsing
+def test_parse_many_add_failure(monkeypatch):
+    _parser = RlyParser()
+    _build_node_map = _parser._build_node_map
+    _built: typing.List[int] = []
+
+    def _failing_build(columns, edges):
+        _built.append(columns.n_active_elements)
+        if len(_built) == 2:
+            raise ValueError("Bad graph")
+        return _build_node_map(columns, edges)
+
+    monkeypatch.setattr(_parser, "_build_node_map", _failing_build)
+    with tempfile.TemporaryDirectory() as temp_d:
+        _rly_file = shutil.copy(RLY_FILE, os.path.join(temp_d, "Broken.rly"))
+        _results = _parser.parse_many([RLY_FILE, _rly_file], workers=2)
+    assert [r.ok for r in _results] == [True, False]
+    assert _results[1].error == "ValueError: Bad graph"
+    assert list(_parser.keys()) == ["Antwerpen_Centraal"]
+    assert not _parser._rly_data
+    assert _parser.data
+    assert list(_parser._rly_data) == ["Antwerpen_Centraal"]